@@ -14,10 +14,27 @@ import json
 from flask_cors import CORS
 from utilities.handlers import *
 from utilities.utils import is_valid_email, is_valid_ticket_id, validate_uuid
+from utilities.event_loop import async_to_sync, iterate_async, run_coroutine
+from utilities.db_and_queries.pool_registry import init_pools
+from utilities.cache import all_cache_stats
+from utilities.account_tree import parse_tree_options
+from utilities.compression import compress_response
+from utilities.serializers import json_response
 
-app = Flask(__name__)
+
+class SupportToolApp(Flask):
+    def async_to_sync(self, func):
+        # run every async view on one long-lived loop so pooled DB connections survive between requests
+        return async_to_sync(func)
+
+
+app = SupportToolApp(__name__)
 
 CORS(app)  # Enable CORS for all routes
+app.after_request(compress_response)
+
+if os.getenv('WARM_UP_DB_POOLS'):
+    run_coroutine(init_pools())
 
 
 @app.route('/get_all_data_by_vendor_id', methods=['POST'])
@@ -27,15 +44,29 @@ async def get_data_by_vendor_id():
         
         vendor_id = data.get('vendorId', '')
         region = data.get('region', None)
+        no_cache = bool(data.get('noCache', False))
+        stream = bool(data.get('stream', False))
+        options = parse_tree_options(include=data.get('include', None), fields=data.get('fields', None))
 
         is_valid = validate_uuid(uuid_string=vendor_id)
 
         if not is_valid:
             return jsonify({'error': 'Invalid vendor id'})
+
+        if options is None:
+            return jsonify({'error': 'Invalid include or fields'})
+
+        if stream:
+            # the body is produced on the background loop while the WSGI server sends it, one vendor at a time;
+            # the 200 is sent before the tenants are loaded, so a query failing midway leaves a truncated body
+            # (invalid JSON) that clients must treat as an error, and the tree is never cached
+            chunks = iterate_async(stream_account_data_by_vendor_id(vendor_id=vendor_id, region=region, use_cache=not no_cache, options=options))
+
+            return app.response_class(chunks, mimetype='application/json')
         
-        data = await get_all_account_data_by_vendor_id(vendor_id=vendor_id, region=region)
+        data = await get_all_account_data_by_vendor_id(vendor_id=vendor_id, region=region, use_cache=not no_cache, options=options)
 
-        return data
+        return json_response(data, fieldsets=options.fieldsets)
     
     else:
         return jsonify({'error': 'Method not allowed'})
@@ -47,15 +78,20 @@ async def get_data_by_tenant_id():
         
         tenant_id = data.get('tenantId', '')
         region = data.get('region', None)
+        no_cache = bool(data.get('noCache', False))
+        options = parse_tree_options(include=data.get('include', None), fields=data.get('fields', None))
 
         is_valid = validate_uuid(uuid_string=tenant_id)
 
         if not is_valid:
             return jsonify({'error': 'Invalid tenant id'})
+
+        if options is None:
+            return jsonify({'error': 'Invalid include or fields'})
         
-        data = await get_all_account_data_by_tenant_id(tenant_id=tenant_id, region=region)
+        data = await get_all_account_data_by_tenant_id(tenant_id=tenant_id, region=region, use_cache=not no_cache, options=options)
 
-        return data
+        return json_response(data, fieldsets=options.fieldsets)
     
     else:
         return jsonify({'error': 'Method not allowed'})
@@ -67,33 +103,106 @@ async def get_data_by_email():
         
         email = data.get('emailAddress', '')
         region = data.get('region', None)
+        no_cache = bool(data.get('noCache', False))
+        options = parse_tree_options(include=data.get('include', None), fields=data.get('fields', None))
         is_valid = await is_valid_email(email=email)
 
         if not is_valid:
             return jsonify({'error': 'Invalid email address'})
+
+        if options is None:
+            return jsonify({'error': 'Invalid include or fields'})
         
-        data = await get_all_account_data_by_user_email(user_email=email, region=region)
+        data = await get_all_account_data_by_user_email(user_email=email, region=region, use_cache=not no_cache, options=options)
 
-        return data
+        return json_response(data, fieldsets=options.fieldsets)
+    
+    else:
+        return jsonify({'error': 'Method not allowed'})
+    
+@app.route('/get_tenants_page', methods=['POST'])
+async def get_tenants_page():
+    if request.method == 'POST':
+        data = json.loads(request.data)
+        
+        vendor_id = data.get('vendorId', '')
+        region = data.get('region', None)
+        page_size = data.get('pageSize', TENANTS_PAGE_SIZE)
+        cursor = data.get('cursor', None)
+        options = parse_tree_options(include=data.get('include', None), fields=data.get('fields', None))
+
+        is_valid = validate_uuid(uuid_string=vendor_id)
+
+        if not is_valid:
+            return jsonify({'error': 'Invalid vendor id'})
+
+        if type(page_size) is not int or not 0 < page_size <= TENANTS_PAGE_MAX_SIZE:
+            return jsonify({'error': f'Invalid page size, between 1 and {TENANTS_PAGE_MAX_SIZE}'})
+
+        if options is None or not options.tenants:
+            return jsonify({'error': 'Invalid include or fields'})
+        
+        data = await get_tenants_page_by_vendor_id(vendor_id=vendor_id, region=region, page_size=page_size, cursor=cursor, options=options)
+
+        return json_response(data, fieldsets=options.fieldsets)
     
     else:
         return jsonify({'error': 'Method not allowed'})
+
+@app.route('/get_all_data_batch', methods=['POST'])
+async def get_data_batch():
+    if request.method == 'POST':
+        data = json.loads(request.data)
+        
+        vendor_ids = data.get('vendorIds', []) or []
+        tenant_ids = data.get('tenantIds', []) or []
+        emails = data.get('emails', []) or []
+        no_cache = bool(data.get('noCache', False))
+        options = parse_tree_options(include=data.get('include', None), fields=data.get('fields', None))
+
+        if not all(isinstance(ids, list) for ids in (vendor_ids, tenant_ids, emails)):
+            return jsonify({'error': 'Invalid ids, vendorIds, tenantIds and emails must be lists'})
+
+        if len(vendor_ids) + len(tenant_ids) + len(emails) > BATCH_LOOKUP_MAX_IDS:
+            return jsonify({'error': f'Too many IDs, at most {BATCH_LOOKUP_MAX_IDS} per request'})
+
+        invalid_ids = [id for id in vendor_ids + tenant_ids if not isinstance(id, str) or not validate_uuid(uuid_string=id)]
+        invalid_ids += [email for email in emails if not isinstance(email, str) or not await is_valid_email(email=email)]
+
+        if invalid_ids:
+            return jsonify({'error': 'Invalid ids', 'invalid_ids': invalid_ids})
+
+        if options is None:
+            return jsonify({'error': 'Invalid include or fields'})
+        
+        data = await get_all_account_data_in_batch(vendor_ids=vendor_ids, tenant_ids=tenant_ids, emails=emails, use_cache=not no_cache, options=options)
+
+        return json_response(data, fieldsets=options.fieldsets)
     
+    else:
+        return jsonify({'error': 'Method not allowed'})
+
 @app.route('/get_all_data_by_ticket', methods=['POST'])
 async def get_data_by_ticket():
     if request.method == 'POST':
         data = json.loads(request.data)
         
         ticket = data.get('ticketNumber', '')
+        no_cache = bool(data.get('noCache', False))
+        all_accounts = bool(data.get('allAccounts', False))
+        options = parse_tree_options(include=data.get('include', None), fields=data.get('fields', None))
 
         is_valid = is_valid_ticket_id(ticket_id=ticket)
 
         if not is_valid:
             return jsonify({'error': 'Invalid ticket number'})
+
+        if options is None:
+            return jsonify({'error': 'Invalid include or fields'})
         
-        data = await get_all_account_data_by_zendesk_ticket_number(ticket_number=ticket)
+        data = await get_all_account_data_by_zendesk_ticket_number(ticket_number=ticket, use_cache=not no_cache, all_accounts=all_accounts, options=options)
 
-        return data
+        return json_response(data, fieldsets=options.fieldsets)
     
     else:
         return jsonify({'error': 'Method not allowed'})
@@ -122,6 +231,34 @@ async def remove_trial():
     else:
         return jsonify({'error': 'Method not allowed'})
     
+@app.route('/remove_trial_bulk', methods=['POST'])
+async def remove_trial_bulk():
+    if request.method == 'POST':
+        data = json.loads(request.data)
+        vendor_ids = data.get('vendorIds', []) or []
+        region = data.get('region', None)
+        dry_run = bool(data.get('dryRun', False))
+
+        if not isinstance(vendor_ids, list):
+            return jsonify({'error': 'Invalid ids, vendorIds must be a list'})
+
+        if len(vendor_ids) > BATCH_LOOKUP_MAX_IDS:
+            return jsonify({'error': f'Too many IDs, at most {BATCH_LOOKUP_MAX_IDS} per request'})
+
+        invalid_ids = [vendor_id for vendor_id in vendor_ids if not isinstance(vendor_id, str)]
+        vendor_ids = [vendor_id.strip('\'"') for vendor_id in vendor_ids if isinstance(vendor_id, str)]
+        invalid_ids += [vendor_id for vendor_id in vendor_ids if not validate_uuid(uuid_string=vendor_id)]
+
+        if invalid_ids or not vendor_ids:
+            return jsonify({'error': 'Invalid ids', 'invalid_ids': invalid_ids})
+
+        result = await remove_trial_bulk_process(vendor_ids=vendor_ids, region=region, dry_run=dry_run)
+
+        return jsonify(result)
+    
+    else:
+        return jsonify({'error': 'Method not allowed'})
+    
 @app.route('/white_label', methods=['POST'])
 async def white_label():
     if request.method == 'POST':
@@ -186,6 +323,11 @@ async def white_label():
     else:
         return jsonify({'error': 'Method not allowed'})
 
+@app.route('/cache_stats', methods=['GET'])
+async def cache_stats():
+    # async so the caches are read on the loop that mutates them
+    return jsonify(all_cache_stats())
+
 
 if __name__ == '__main__':
     
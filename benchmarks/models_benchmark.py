@@ -0,0 +1,105 @@
+"""
+Compares the memory footprint and construction time of the account tree models.
+
+The baseline rebuilds the models as plain (per-instance `__dict__`) dataclasses, filled through a keyword
+dictionary per row, which is how the tree was built before the models were slotted. The current models are the
+slotted dataclasses of `models.models`, built with the compiled row constructors.
+
+Usage:
+    python benchmarks/models_benchmark.py [--tenants 50000] [--repeat 5]
+"""
+import argparse
+import dataclasses
+import gc
+import os
+import sys
+import timeit
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(PROJECT_ROOT)
+
+from models.models import SAML_GROUP_COLUMNS, SSO_CONFIG_COLUMNS, TENANT_COLUMNS, SAML_groups, SSO_configs, Tenant, saml_group_from_row, sso_config_from_row, tenant_from_row
+
+
+def _unslotted(model: type) -> type:
+    return dataclasses.make_dataclass(
+        model.__name__,
+        [(field.name, field.type, dataclasses.field(default=field.default)) for field in dataclasses.fields(model)]
+    )
+
+def _dict_constructor(model: type, columns: Dict[str, str]) -> Callable[[Dict[str, Any]], Any]:
+    def from_row(row: Dict[str, Any]) -> Any:
+        return model(**{field: row.get(column) for field, column in columns.items()})
+
+    return from_row
+
+def _make_rows(tenants: int) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    tenant_rows = [
+        {'accountId': f'tenant-{i}', 'name': f'Tenant {i}', 'metadata': '{}', 'vendorId': f'vendor-{i % 10}'}
+        for i in range(tenants)
+    ]
+    sso_config_rows = [
+        {column: f'{column}-{i}' for column in SSO_CONFIG_COLUMNS.values()}
+        for i in range(tenants)
+    ]
+    saml_group_rows = [
+        {column: f'{column}-{i}' for column in SAML_GROUP_COLUMNS.values()}
+        for i in range(tenants)
+    ]
+
+    return tenant_rows, sso_config_rows, saml_group_rows
+
+def _build_tree(rows: Tuple[List[Dict[str, Any]], ...], constructors: Tuple[Callable, ...]) -> List[Any]:
+    tenant_rows, sso_config_rows, saml_group_rows = rows
+    tenant_ctor, sso_config_ctor, saml_group_ctor = constructors
+    tenants = []
+
+    for tenant_row, sso_config_row, saml_group_row in zip(tenant_rows, sso_config_rows, saml_group_rows):
+        tenant = tenant_ctor(tenant_row)
+        tenant.sso_configs = [sso_config_ctor(sso_config_row)]
+        tenant.saml_groups = [saml_group_ctor(saml_group_row)]
+        tenants.append(tenant)
+
+    return tenants
+
+def _measure_memory(build: Callable[[], List[Any]]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    tree = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tree
+
+    return size
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tenants', type=int, default=50000, help='number of tenants, each with one SSO configuration and one SAML group')
+    parser.add_argument('--repeat', type=int, default=5, help='number of timed runs, the best one is reported')
+    args = parser.parse_args()
+
+    rows = _make_rows(tenants=args.tenants)
+    variants = {
+        'dict dataclasses': (
+            _dict_constructor(_unslotted(Tenant), TENANT_COLUMNS),
+            _dict_constructor(_unslotted(SSO_configs), SSO_CONFIG_COLUMNS),
+            _dict_constructor(_unslotted(SAML_groups), SAML_GROUP_COLUMNS),
+        ),
+        'slotted + compiled': (tenant_from_row, sso_config_from_row, saml_group_from_row),
+    }
+
+    print(f'{args.tenants} tenants, 1 SSO configuration and 1 SAML group each\n')
+    print(f'{"models":<20}{"memory (MiB)":>14}{"build (ms)":>14}')
+
+    for name, constructors in variants.items():
+        build = lambda: _build_tree(rows=rows, constructors=constructors)
+        memory = _measure_memory(build=build)
+        seconds = min(timeit.repeat(build, number=1, repeat=args.repeat))
+
+        print(f'{name:<20}{memory / 2 ** 20:>14.1f}{seconds * 1000:>14.1f}')
+
+
+if __name__ == '__main__':
+    main()
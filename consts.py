@@ -1,3 +1,5 @@
+from models.models import SAML_GROUP_COLUMNS, SSO_CONFIG_COLUMNS, TENANT_COLUMNS, VENDOR_COLUMNS
+
 BASE_EU_PATH = 'https://api.frontegg.com'
 BASE_US_PATH = 'https://api.us.frontegg.com'
 BASE_CA_PATH = 'https://api.ca.frontegg.com'
@@ -9,35 +11,121 @@ FRONTEGG_WHITE_LABEL = '/vendors/whitelabel-mode'
 FRONTEGG_AUTH_AS_VENDOR = '/auth/vendor/'
 ZENDESK_USERS_FROM_TICKET_URL = 'https://frontegg-help.zendesk.com/api/v2/tickets/{}?include=users'
 
-GET_VENDOR_BY_ID_QUERY = 'SELECT * FROM frontegg_vendors.vendors v WHERE v.id ={}'
-GET_VENDORS_IDS_BY_ACCOUNT_ID_QUERY = 'SELECT * FROM frontegg_vendors.vendors v  WHERE v.accountId={}'
+def _select_list(alias: str, columns) -> str:
+    return ', '.join(f'{alias}.`{column}`' for column in columns)
+
+VENDOR_SELECT = _select_list('v', VENDOR_COLUMNS.values())
+TENANT_SELECT = _select_list('x', TENANT_COLUMNS.values())
+SSO_CONFIG_SELECT = _select_list('sc', SSO_CONFIG_COLUMNS.values())
+SAML_GROUP_SELECT = _select_list('sg', SAML_GROUP_COLUMNS.values())
+ACCOUNT_SELECT = _select_list('a', ['id', 'name', 'accountTenantId'])
+SSO_DOMAIN_SELECT = _select_list('sd', ['tenantId', 'ssoConfigId'])
+
+GET_VENDOR_BY_ID_QUERY = 'SELECT v.id, v.accountId, v.whiteLabelMode FROM frontegg_vendors.vendors v WHERE v.id=%s'
+GET_VENDORS_IDS_BY_ACCOUNT_ID_QUERY = f'SELECT {VENDOR_SELECT} FROM frontegg_vendors.vendors v  WHERE v.accountId=%s'
+
+GET_ACCOUNT_DETAILS_BY_ID = f'SELECT {ACCOUNT_SELECT} FROM frontegg_vendors.accounts a WHERE a.id=%s'
+GET_ACCOUNT_BY_ID_QUERY = f'SELECT {TENANT_SELECT} FROM frontegg_backoffice.accounts x WHERE x.accountId=%s'
+GET_ALL_TENANTS_BY_VENDOR_ID = f'SELECT {TENANT_SELECT} FROM frontegg_backoffice.accounts x WHERE x.vendorId=%s'
+# keyset pagination: the page starts after the last accountId of the previous one, so every page is one index range scan
+GET_TENANTS_PAGE_BY_VENDOR_ID = f'SELECT {TENANT_SELECT} FROM frontegg_backoffice.accounts x WHERE x.vendorId=%s AND x.accountId>%s ORDER BY x.accountId LIMIT %s'
+GET_ACCOUNT_ID_BY_ACCOUNT_TENANT_ID = f'SELECT {ACCOUNT_SELECT} FROM frontegg_vendors.accounts a WHERE a.accountTenantId=%s'
+
+GET_SSO_DOMAINS_BY_TENANT = f'SELECT {SSO_DOMAIN_SELECT} FROM frontegg_team_management.sso_domains sd WHERE sd.tenantId=%s'
+GET_SSO_DOMAINS_BY_VENDOR = f'SELECT {SSO_DOMAIN_SELECT} FROM frontegg_team_management.sso_domains sd WHERE sd.vendorId=%s'
+GET_SSO_CONFIGS_BY_SSO_CONFIG_ID = f'SELECT {SSO_CONFIG_SELECT} FROM frontegg_team_management.sso_configs sc WHERE sc.id=%s'
+GET_SAML_GROUPS_BY_SSO_CONFIG_ID = f'SELECT {SAML_GROUP_SELECT} FROM frontegg_team_management.saml_groups sg WHERE sg.samlConfigId=%s'
 
-GET_ACCOUNT_DETAILS_BY_ID ='SELECT * FROM frontegg_vendors.accounts a WHERE a.id={}'
-GET_ACCOUNT_BY_ID_QUERY ='SELECT x.* FROM frontegg_backoffice.accounts x WHERE x.accountId={}'
-GET_ALL_TENANTS_BY_VENDOR_ID = 'SELECT x.* FROM frontegg_backoffice.accounts x WHERE x.vendorId ={}'
-GET_ACCOUNT_ID_BY_ACCOUNT_TENANT_ID = 'SELECT * FROM frontegg_vendors.accounts a WHERE a.accountTenantId={}'
+# the IN ({}) placeholders are expanded per chunk, so the column lists are concatenated rather than formatted in
+GET_ALL_TENANTS_BY_VENDOR_IDS = 'SELECT ' + TENANT_SELECT + ' FROM frontegg_backoffice.accounts x WHERE x.vendorId IN ({})'
+GET_SSO_DOMAINS_BY_TENANT_IDS = 'SELECT ' + SSO_DOMAIN_SELECT + ' FROM frontegg_team_management.sso_domains sd WHERE sd.tenantId IN ({})'
+GET_SSO_CONFIGS_BY_SSO_CONFIG_IDS = 'SELECT ' + SSO_CONFIG_SELECT + ' FROM frontegg_team_management.sso_configs sc WHERE sc.id IN ({})'
+GET_SAML_GROUPS_BY_SSO_CONFIG_IDS = 'SELECT ' + SAML_GROUP_SELECT + ' FROM frontegg_team_management.saml_groups sg WHERE sg.samlConfigId IN ({})'
+GET_WHITE_LABEL_MODE_BY_VENDOR_IDS = 'SELECT v.id, v.whiteLabelMode FROM frontegg_vendors.vendors v WHERE v.id IN ({})'
+GET_ACCOUNT_IDS_BY_VENDOR_IDS = 'SELECT v.id, v.accountId FROM frontegg_vendors.vendors v WHERE v.id IN ({})'
+GET_VENDOR_IDS_BY_TENANT_IDS = 'SELECT x.accountId, x.vendorId FROM frontegg_backoffice.accounts x WHERE x.accountId IN ({})'
+GET_ACCOUNTS_DETAILS_BY_IDS = 'SELECT ' + ACCOUNT_SELECT + ' FROM frontegg_vendors.accounts a WHERE a.id IN ({})'
+GET_ACCOUNT_IDS_BY_ACCOUNT_TENANT_IDS = 'SELECT a.id, a.accountTenantId FROM frontegg_vendors.accounts a WHERE a.accountTenantId IN ({})'
+GET_ACCOUNT_TENANT_IDS_BY_EMAILS_AND_FE_PROD_ID = 'SELECT u.email, u.tenantId FROM frontegg_identity.users u WHERE u.email IN ({}) AND u.vendorId=%s'
 
-GET_SSO_DOMAINS_BY_TENANT = 'SELECT * FROM frontegg_team_management.sso_domains sd WHERE sd.tenantId={}'
-GET_SSO_DOMAINS_BY_VENDOR = 'SELECT * FROM frontegg_team_management.sso_domains sd WHERE sd.vendorId={}'
-GET_SSO_CONFIGS_BY_SSO_CONFIG_ID = 'SELECT * FROM frontegg_team_management.sso_configs sc WHERE sc.id={}'
-GET_SAML_GROUPS_BY_SSO_CONFIG_ID = 'SELECT * FROM frontegg_team_management.saml_groups sg WHERE sg.samlConfigId={}'
+GET_ROLE_NAME_BY_ID_QUERY = 'SELECT x.* FROM frontegg_identity.roles x WHERE x.id=%s'
+GET_ROLES_BY_USER_TEN_ID_QUERY = 'SELECT x.* FROM frontegg_identity.users_tenants_roles x WHERE x.userTenantId=%s'
+GET_USER_TENANT_BY_USER_ID_AND_TEN_ID_QUERY = 'SELECT x.* from frontegg_identity.users_tenants x WHERE x.userId=%s AND x.tenantId=%s'
 
-GET_ROLE_NAME_BY_ID_QUERY = 'SELECT x.* FROM frontegg_identity.roles x WHERE x.id={}'
-GET_ROLES_BY_USER_TEN_ID_QUERY = 'SELECT x.* FROM frontegg_identity.users_tenants_roles x WHERE x.userTenantId={}'
-GET_USER_TENANT_BY_USER_ID_AND_TEN_ID_QUERY = 'SELECT x.* from frontegg_identity.users_tenants x WHERE x.userId={} AND x.tenantId={}'
+GET_TENANT_CONFIGURATIONS_QUERY = 'SELECT x.id, x.tenantId from frontegg_subscriptions.tenant_configurations x WHERE x.tenantId=%s'
+GET_TENANT_CONFIGURATIONS_BY_TENANT_IDS = 'SELECT x.id, x.tenantId from frontegg_subscriptions.tenant_configurations x WHERE x.tenantId IN ({})'
 
-GET_TENANT_CONFIGURATIONS_QUERY = 'SELECT x.* from frontegg_subscriptions.tenant_configurations x WHERE x.tenantId={}'
+GET_ACCOUNT_TENANT_ID_BY_EMAIL_AND_FE_PROD_ID = 'SELECT u.id, u.tenantId FROM frontegg_identity.users u WHERE u.email=%s AND u.vendorId=%s'
 
-GET_ACCOUNT_TENANT_ID_BY_EMAIL_AND_FE_PROD_ID = 'SELECT * FROM frontegg_identity.users u WHERE u.email={} AND u.vendorId={}'
+# one-query counterparts of the email -> account -> vendor chain
+GET_ACCOUNT_AND_VENDOR_BY_ACCOUNT_TENANT_ID = (
+    f'SELECT {ACCOUNT_SELECT}, v.id AS vendorId FROM frontegg_vendors.accounts a '
+    'JOIN frontegg_vendors.vendors v ON v.accountId = a.id WHERE a.accountTenantId=%s LIMIT 1'
+)
+GET_USER_ACCOUNT_AND_VENDOR_BY_EMAIL_AND_FE_PROD_ID = (
+    f'SELECT u.id AS userId, u.tenantId, {ACCOUNT_SELECT}, v.id AS vendorId FROM frontegg_identity.users u '
+    'JOIN frontegg_vendors.accounts a ON a.accountTenantId = u.tenantId '
+    'JOIN frontegg_vendors.vendors v ON v.accountId = a.id WHERE u.email=%s AND u.vendorId=%s LIMIT 1'
+)
 
-AND_DOMAIN = 'AND sd.domain = {}'
+AND_DOMAIN = 'AND sd.domain = %s'
 
 GENERAL = 'GENERAL'
 IDENTITY = 'IDENTITY'
 REGIONS = ['EU', 'US']
 # REGIONS = ['EU', 'US', 'CA', 'AU']
 
+DB_POOL_MIN_SIZE = 1
+DB_POOL_MAX_SIZE = 10
+DB_POOL_RECYCLE = 3600
+
+BATCH_QUERY_CHUNK_SIZE = 1000
+ITER_QUERY_FETCH_SIZE = 500
+
+REGION_LOCATOR_MAX_SIZE = 10000
+REGION_LOCATOR_TTL = 60 * 60
+
+ACCOUNT_TREE_CACHE_MAX_SIZE = 200
+ACCOUNT_TREE_CACHE_TTL = 5 * 60
+ACCOUNT_ALIAS_CACHE_MAX_SIZE = 200000
+ACCOUNT_TREE_BATCHED = True
+
+HTTP_TIMEOUT = 30
+HTTP_CONNECT_TIMEOUT = 5
+HTTP_POOL_LIMIT_PER_HOST = 20
+HTTP_KEEPALIVE_TIMEOUT = 60
+
+VENDOR_TOKEN_REFRESH_MARGIN = 5 * 60
+VENDOR_TOKEN_DEFAULT_TTL = 10 * 60
+
+WHITE_LABEL_CONCURRENCY = 10
+TICKET_EMAIL_CONCURRENCY = 5
+
+ZENDESK_CACHE_MAX_SIZE = 1000
+ZENDESK_CACHE_TTL = 60
+ZENDESK_CACHE_STALE_TTL = 60 * 60
+ZENDESK_RATE_LIMIT_RESERVE = 10
+ZENDESK_RATE_LIMIT_BACKOFF = 60
+
+BATCH_LOOKUP_MAX_IDS = 500
+BATCH_ACCOUNT_CONCURRENCY = 4
+REMOVE_TRIAL_CONCURRENCY = 10
+EMAIL_JOINED_RESOLUTION = True
+
+TENANTS_PAGE_SIZE = 100
+TENANTS_PAGE_MAX_SIZE = 1000
+
+# 'builtin' (byte-identical to jsonify) or 'orjson'
+JSON_BACKEND = 'builtin'
+
+RESPONSE_ETAG_CACHE_MAX_SIZE = 1000
+ENCODER_CACHE_MAX_SIZE = 256
+ENCODER_CACHE_TTL = 60 * 60
+COMPRESSION_MIN_SIZE = 1024
+GZIP_COMPRESSION_LEVEL = 6
+BROTLI_COMPRESSION_QUALITY = 5
+
 # TODO:
 # 1. edge case :: in search in all regions when an account is under few regions (for example - Talon) 
 # 3. add creds for CA and AU
-# 4. add a logger
\ No newline at end of file
+# 4. add a logger
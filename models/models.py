@@ -1,21 +1,21 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from datetime import datetime
-from typing import List, Dict
+from typing import Any, Callable, Dict, FrozenSet, List, Tuple
 
     
-@dataclass(frozen=False)
+@dataclass(frozen=False, slots=True)
 class Builder_configs:
     id: str = None
     name: str = None
 
-@dataclass(frozen=False)
+@dataclass(frozen=False, slots=True)
 class SAML_groups:
     id: str = None
     samlConfigId: str = None
     enabled: int = None
     group: str = None
     
-@dataclass(frozen=False)
+@dataclass(frozen=False, slots=True)
 class SSO_configs:
     id: str = None
     vendorId: str = None
@@ -32,7 +32,7 @@ class SSO_configs:
     skipEmailDomainValidation: str = None
     overrideActiveTenant: str = None
 
-@dataclass(frozen=False)
+@dataclass(frozen=False, slots=True)
 class Tenant:
     id: str = None 
     name: str = None
@@ -42,7 +42,7 @@ class Tenant:
     saml_groups: SAML_groups = None
     builder_configs: Builder_configs = None
 
-@dataclass(frozen=False)
+@dataclass(frozen=False, slots=True)
 class Vendor:
     id: str = None 
     env_name: str = None
@@ -55,7 +55,7 @@ class Vendor:
     account_id: str = None
     tenants: List[Tenant] = None
 
-@dataclass(frozen=False)
+@dataclass(frozen=False, slots=True)
 class Account:
     id: str = None
     name: str = None
@@ -67,4 +67,93 @@ class Account:
 @dataclass(frozen=False)
 class Context:
     id: str = None
-    account: Account = None
\ No newline at end of file
+    account: Account = None
+
+@dataclass(frozen=False)
+class ResolutionContext:
+    # carried through a multi-step lookup so later steps reuse the region and the rows earlier steps found
+    region: str = None
+    user: Dict = None
+    account: Dict = None
+    vendor: Dict = None
+
+@dataclass(frozen=True)
+class TreeOptions:
+    # which subtrees of an account tree are loaded, and which fields of each model are returned (all when absent);
+    # hashable, so it is part of the cache and single-flight keys
+    tenants: bool = True
+    sso: bool = True
+    saml: bool = True
+    fieldsets: Tuple[Tuple[type, FrozenSet[str]], ...] = ()
+
+FULL_TREE = TreeOptions()
+
+
+def column_map(model: type, renamed: Dict[str, str] = None, exclude: tuple = ()) -> Dict[str, str]:
+    """
+    Derives the field -> table column mapping of a model from its dataclass fields.
+
+    Args:
+        model (type): The model dataclass.
+        renamed (Dict[str, str], optional): Fields whose column has a different name. Defaults to None.
+        exclude (tuple, optional): Fields that are not read from the table (nested models). Defaults to ().
+
+    Returns:
+        Dict[str, str]: The column name of each field, in field order.
+    """
+    renamed = renamed or {}
+
+    return {field.name: renamed.get(field.name, field.name) for field in fields(model) if field.name not in exclude}
+
+
+VENDOR_COLUMNS = column_map(
+    Vendor,
+    renamed={
+        'env_name': 'environmentName',
+        'app_url': 'appURL',
+        'login_url': 'loginURL',
+        'fe_stack': 'frontendStack',
+        'be_stack': 'backendStack',
+        'account_id': 'accountId',
+    },
+    exclude=('tenants',)
+)
+TENANT_COLUMNS = column_map(
+    Tenant,
+    renamed={'id': 'accountId', 'meta_data': 'metadata', 'vendor_id': 'vendorId'},
+    exclude=('sso_configs', 'saml_groups', 'builder_configs')
+)
+# config_metadata has never been read from the sso_configs row, so it is not projected either
+SSO_CONFIG_COLUMNS = column_map(SSO_configs, exclude=('config_metadata',))
+SAML_GROUP_COLUMNS = column_map(SAML_groups)
+
+
+def row_constructor(model: type, columns: Dict[str, str]) -> Callable[[Dict[str, Any]], Any]:
+    """
+    Compiles a function that builds a model straight from a table row, using a field -> column mapping.
+
+    The generated function passes every mapped column as a keyword argument in a single call, instead of building an
+    intermediate keyword dictionary for each row.
+
+    Args:
+        model (type): The model dataclass.
+        columns (Dict[str, str]): The column name of each field, as returned by `column_map`.
+
+    Returns:
+        Callable[[Dict[str, Any]], Any]: The constructor, taking a row dictionary and returning a model instance.
+    """
+    arguments = ', '.join(f'{field}=get({column!r})' for field, column in columns.items())
+    namespace = {'model': model}
+
+    exec(f'def from_row(row):\n    get = row.get\n    return model({arguments})\n', namespace)
+
+    from_row = namespace['from_row']
+    from_row.__name__ = from_row.__qualname__ = f'{model.__name__.lower()}_from_row'
+
+    return from_row
+
+
+vendor_from_row = row_constructor(Vendor, VENDOR_COLUMNS)
+tenant_from_row = row_constructor(Tenant, TENANT_COLUMNS)
+sso_config_from_row = row_constructor(SSO_configs, SSO_CONFIG_COLUMNS)
+saml_group_from_row = row_constructor(SAML_groups, SAML_GROUP_COLUMNS)
@@ -0,0 +1,55 @@
+import asyncio
+import re
+
+import utilities.account_tree as account_tree
+import utilities.db_and_queries.connections_and_queries as connections_and_queries
+from consts import *
+
+# the sso_configs row as `SELECT *` returned it before the projection was explicit
+SSO_CONFIG_ROW = {
+    'id': 'c1',
+    'vendorId': 'v1',
+    'tenantId': 't1',
+    'domain': 'acme.com',
+    'validated': 1,
+    'ssoEndpoint': 'https://idp.acme.com/sso',
+    'publicCertificate': 'cert',
+    'signRequest': 0,
+    'acsUrl': 'https://app.acme.com/acs',
+    'type': 'saml',
+    'spEntityId': 'acme',
+    'skipEmailDomainValidation': 0,
+    'overrideActiveTenant': 1,
+    'createdAt': '2024-01-01',
+}
+TABLE_ROWS = {
+    'sso_domains': [{'tenantId': 't1', 'ssoConfigId': 'c1'}],
+    'sso_configs': [SSO_CONFIG_ROW],
+}
+
+
+def _project(query, row):
+    # like MySQL, only the selected columns come back, and selecting a column the table lacks fails the query
+    columns = re.findall(r'`(\w+)`', query.split(' FROM ')[0])
+    missing = [column for column in columns if column not in row]
+
+    if missing:
+        raise AssertionError(f'unknown columns {missing}')
+
+    return {column: row[column] for column in columns}
+
+
+def test_sso_configs_keep_the_columns_select_star_returned(monkeypatch):
+    async def fetch_all_query(db_pool, query, args=None):
+        table = re.search(r'frontegg_team_management\.(\w+)', query).group(1)
+        return [_project(query, row) for row in TABLE_ROWS[table]]
+
+    monkeypatch.setattr(connections_and_queries, 'fetch_all_query', fetch_all_query)
+
+    sso_by_tenant_id = asyncio.run(account_tree.load_sso_configs_by_tenant_ids(tenant_ids=['t1'], db_pool=None))
+    sso_configs_list, config_id = sso_by_tenant_id['t1']
+
+    assert config_id == 'c1'
+    assert sso_configs_list[0].domain == 'acme.com'
+    assert sso_configs_list[0].validated == 1
+    assert sso_configs_list[0].ssoEndpoint == 'https://idp.acme.com/sso'
@@ -0,0 +1,140 @@
+import asyncio
+
+import pytest
+from flask import Flask
+
+import utilities.account_tree as account_tree
+import utilities.db_and_queries.connections_and_queries as connections_and_queries
+import utilities.handlers as handlers
+from consts import *
+from models.models import Account, TreeOptions, Vendor
+from utilities.account_cache import ALIAS_EMAIL, alias_account, cache_account
+from utilities.cache import _caches
+
+PROD_VENDOR_ID = 'prod'
+PROD_VENDOR_ERROR = 'Nice try! are trying to f@#k my app?!\nDONT ENTER FRONTEGG\'S PROD ID'
+VENDORS_ONLY = TreeOptions(tenants=False)
+
+# the EU rows: acc1 is a customer with vendor v1 and tenant t1, prod-acc is Frontegg's own account with the
+# production vendor and a sibling environment fe-dev; users are the IDENTITY rows of Frontegg's production vendor
+VENDORS = [
+    {'id': 'v1', 'accountId': 'acc1', 'environmentName': 'prod'},
+    {'id': PROD_VENDOR_ID, 'accountId': 'prod-acc', 'environmentName': 'prod'},
+    {'id': 'fe-dev', 'accountId': 'prod-acc', 'environmentName': 'dev'},
+]
+TENANTS = [{'accountId': 't1', 'vendorId': 'v1'}]
+USERS = [
+    {'email': 'user@acme.com', 'tenantId': 'at1'},
+    {'email': 'staff@frontegg.com', 'tenantId': 'at-prod'},
+]
+ACCOUNTS = [
+    {'id': 'acc1', 'name': 'Acme', 'accountTenantId': 'at1'},
+    {'id': 'prod-acc', 'name': 'Frontegg', 'accountTenantId': 'at-prod'},
+]
+# IN (...) query -> (rows, column matched by the IN values)
+IN_QUERIES = {
+    GET_VENDOR_IDS_BY_TENANT_IDS: (TENANTS, 'accountId'),
+    GET_ACCOUNT_TENANT_IDS_BY_EMAILS_AND_FE_PROD_ID: (USERS, 'email'),
+    GET_ACCOUNT_IDS_BY_ACCOUNT_TENANT_IDS: (ACCOUNTS, 'accountTenantId'),
+    GET_ACCOUNT_IDS_BY_VENDOR_IDS: (VENDORS, 'id'),
+    GET_ACCOUNTS_DETAILS_BY_IDS: (ACCOUNTS, 'id'),
+}
+
+
+class FakeRegions:
+    def __init__(self):
+        self.failing = set()
+        self.unreachable = set()
+        self.built = []
+
+    async def get_db_pool(self, db_type=GENERAL, region='EU'):
+        if region in self.unreachable:
+            raise ConnectionError(f'cannot reach {region}')
+
+        return (db_type, region)
+
+    async def fetch_all_query(self, db_pool, query, args=None):
+        await asyncio.sleep(0)
+        _, region = db_pool
+
+        if region in self.failing:
+            return None
+
+        if query == GET_VENDORS_IDS_BY_ACCOUNT_ID_QUERY:
+            self.built.append(args[0])
+            return [dict(row) for row in VENDORS if row['accountId'] == args[0]]
+
+        for template, (rows, column) in IN_QUERIES.items():
+            if query.startswith(template.split('{}')[0]):
+                return [dict(row) for row in rows if row[column] in args] if region == 'EU' else []
+
+        raise AssertionError(f'unexpected query: {query}')
+
+
+@pytest.fixture
+def regions(monkeypatch):
+    fake = FakeRegions()
+
+    monkeypatch.setattr(handlers, 'get_db_pool', fake.get_db_pool)
+    monkeypatch.setattr(connections_and_queries, 'fetch_all_query', fake.fetch_all_query)
+    monkeypatch.setattr(account_tree, 'fetch_all_query', fake.fetch_all_query)
+    monkeypatch.setattr(handlers, 'REGIONS', ['EU', 'US'])
+    monkeypatch.setenv('PROD_VENDOR_ID', PROD_VENDOR_ID)
+
+    for cache in _caches.values():
+        cache.clear()
+
+    return fake
+
+
+def _batch(vendor_ids=(), tenant_ids=(), emails=(), use_cache=False):
+    with Flask(__name__).app_context():
+        return asyncio.run(handlers.get_all_account_data_in_batch(
+            vendor_ids=list(vendor_ids), tenant_ids=list(tenant_ids), emails=list(emails), use_cache=use_cache, options=VENDORS_ONLY
+        ))
+
+
+def test_batch_refuses_every_input_of_the_prod_account(regions):
+    data = _batch(vendor_ids=[PROD_VENDOR_ID, 'fe-dev', 'v1'], tenant_ids=['t1'], emails=['staff@frontegg.com', 'user@acme.com'])
+
+    assert data['errors'] == {
+        'vendor_ids': {PROD_VENDOR_ID: PROD_VENDOR_ERROR, 'fe-dev': PROD_VENDOR_ERROR},
+        'tenant_ids': {},
+        'emails': {'staff@frontegg.com': PROD_VENDOR_ERROR},
+    }
+    assert data['vendor_ids'] == {PROD_VENDOR_ID: None, 'fe-dev': None, 'v1': 'acc1'}
+    assert data['emails'] == {'staff@frontegg.com': None, 'user@acme.com': 'acc1'}
+    assert list(data['accounts']) == ['acc1']
+    assert regions.built == ['acc1']
+
+
+def test_batch_refuses_a_cached_prod_account(regions):
+    prod_account = Account(id='prod-acc', vendors=[Vendor(id=PROD_VENDOR_ID)])
+    cache_account(account_id='prod-acc', account_data=prod_account)
+    alias_account(kind=ALIAS_EMAIL, key='staff@frontegg.com', account_id='prod-acc')
+
+    data = _batch(emails=['staff@frontegg.com'], use_cache=True)
+
+    assert data['errors']['emails'] == {'staff@frontegg.com': PROD_VENDOR_ERROR}
+    assert data['accounts'] == {}
+
+
+def test_batch_reports_the_inputs_of_a_failed_region(regions):
+    regions.failing.add('US')
+
+    data = _batch(vendor_ids=['v1', 'v-unknown'])
+
+    # v1 was found in EU, so only the input no region answered for is in doubt
+    assert data['vendor_ids'] == {'v1': 'acc1', 'v-unknown': None}
+    assert data['errors']['vendor_ids'] == {'v-unknown': 'lookup failed in US'}
+    assert list(data['accounts']) == ['acc1']
+
+
+def test_batch_survives_an_unreachable_region(regions):
+    regions.unreachable.add('EU')
+
+    data = _batch(emails=['user@acme.com'])
+
+    assert data['emails'] == {'user@acme.com': None}
+    assert data['errors']['emails'] == {'user@acme.com': 'lookup failed in EU'}
+    assert data['accounts'] == {}
@@ -0,0 +1,136 @@
+import asyncio
+
+import pytest
+from flask import Flask
+
+import utilities.account_tree as account_tree
+import utilities.db_and_queries.connections_and_queries as connections_and_queries
+import utilities.handlers as handlers
+import utilities.region_locator as region_locator
+from consts import *
+from utilities.cache import _caches
+
+EMAIL = 'user@acme.com'
+
+# the rows of the fixture account, all in the EU databases: one environment, one tenant with an SSO configuration and a SAML group
+ROWS = {
+    GET_ACCOUNT_TENANT_ID_BY_EMAIL_AND_FE_PROD_ID: [{'id': 'u1', 'tenantId': 'at1'}],
+    GET_USER_ACCOUNT_AND_VENDOR_BY_EMAIL_AND_FE_PROD_ID: [{'userId': 'u1', 'tenantId': 'at1', 'id': 'acc1', 'name': 'Acme', 'accountTenantId': 'at1', 'vendorId': 'v1'}],
+    GET_ACCOUNT_AND_VENDOR_BY_ACCOUNT_TENANT_ID: [{'id': 'acc1', 'name': 'Acme', 'accountTenantId': 'at1', 'vendorId': 'v1'}],
+    GET_VENDORS_IDS_BY_ACCOUNT_ID_QUERY: [{'id': 'v1', 'environmentName': 'prod', 'accountId': 'acc1'}],
+    GET_ALL_TENANTS_BY_VENDOR_IDS: [{'accountId': 't1', 'name': 'Tenant', 'vendorId': 'v1'}],
+    GET_SSO_DOMAINS_BY_TENANT_IDS: [{'tenantId': 't1', 'ssoConfigId': 'c1'}],
+    GET_SSO_CONFIGS_BY_SSO_CONFIG_IDS: [{'id': 'c1', 'tenantId': 't1'}],
+    GET_SAML_GROUPS_BY_SSO_CONFIG_IDS: [{'id': 'g1', 'samlConfigId': 'c1'}],
+}
+TREE_QUERIES = 5
+
+
+class FakeDatabases:
+    def __init__(self):
+        self.queries = []
+
+    def rows(self, db_pool, query):
+        self.queries.append((db_pool, query))
+        _, region = db_pool
+
+        for template, rows in ROWS.items():
+            if query == template or '{}' in template and query.startswith(template.split('{}')[0]):
+                return [dict(row) for row in rows] if region == 'EU' else []
+
+        raise AssertionError(f'unexpected query: {query}')
+
+    async def get_db_pool(self, db_type=GENERAL, region='EU'):
+        return (db_type, region)
+
+    async def fetch_one_query(self, db_pool, query, args=None):
+        await asyncio.sleep(0)
+        rows = self.rows(db_pool, query)
+        return rows[0] if rows else None
+
+    async def fetch_all_query(self, db_pool, query, args=None):
+        await asyncio.sleep(0)
+        return self.rows(db_pool, query)
+
+    async def iter_query(self, db_pool, query, args=None, batch_size=None):
+        for row in self.rows(db_pool, query):
+            yield row
+
+
+@pytest.fixture
+def databases(monkeypatch):
+    fake = FakeDatabases()
+
+    for module in (handlers, account_tree, connections_and_queries, region_locator):
+        for name in ('get_db_pool', 'fetch_one_query', 'fetch_all_query', 'iter_query'):
+            if hasattr(module, name):
+                monkeypatch.setattr(module, name, getattr(fake, name))
+
+    monkeypatch.setenv('PROD_VENDOR_ID', 'prod')
+    monkeypatch.setattr(handlers, 'EMAIL_JOINED_RESOLUTION', True)
+    monkeypatch.setattr(handlers, 'REGIONS', ['EU', 'US'])
+    monkeypatch.setattr(connections_and_queries, 'REGIONS', ['EU', 'US'])
+    monkeypatch.setattr(handlers, 'has_db_pool', lambda db_type, region: True)
+
+    for cache in _caches.values():
+        cache.clear()
+
+    return fake
+
+
+def _resolve(region=None):
+    with Flask(__name__).app_context():
+        return asyncio.run(handlers.get_all_account_data_by_user_email(user_email=EMAIL, region=region, use_cache=False))
+
+
+def test_unknown_region_probes_identity_then_joins_general(databases, monkeypatch):
+    monkeypatch.setattr(handlers, 'shares_host', lambda region: False)
+
+    account = _resolve()
+
+    assert account.id == 'acc1' and account.region == 'EU'
+    # the user on IDENTITY in every region, then account and vendor in one GENERAL query
+    assert len(databases.queries) == 2 + 1 + TREE_QUERIES
+
+
+def test_given_region_on_separate_hosts(databases, monkeypatch):
+    monkeypatch.setattr(handlers, 'shares_host', lambda region: False)
+
+    account = _resolve(region='EU')
+
+    assert account.id == 'acc1'
+    assert len(databases.queries) == 1 + 1 + TREE_QUERIES
+
+
+def test_given_region_on_a_shared_host_is_one_joined_query(databases, monkeypatch):
+    monkeypatch.setattr(handlers, 'shares_host', lambda region: True)
+
+    account = _resolve(region='EU')
+
+    assert account.id == 'acc1'
+    assert databases.queries[0] == ((GENERAL, 'EU'), GET_USER_ACCOUNT_AND_VENDOR_BY_EMAIL_AND_FE_PROD_ID)
+    assert len(databases.queries) == 1 + TREE_QUERIES
+
+
+def test_existing_pools_are_not_warmed_up_again(databases, monkeypatch):
+    async def init_pools(db_types, regions):
+        raise AssertionError('pools already exist')
+
+    monkeypatch.setattr(handlers, 'shares_host', lambda region: False)
+    monkeypatch.setattr(handlers, 'init_pools', init_pools)
+
+    assert _resolve().id == 'acc1'
+
+
+def test_missing_pools_are_created_during_the_identity_lookup(databases, monkeypatch):
+    warmed_up = []
+
+    async def init_pools(db_types, regions):
+        warmed_up.append((tuple(db_types), list(regions)))
+
+    monkeypatch.setattr(handlers, 'shares_host', lambda region: False)
+    monkeypatch.setattr(handlers, 'init_pools', init_pools)
+    monkeypatch.setattr(handlers, 'has_db_pool', lambda db_type, region: region == 'EU')
+
+    assert _resolve().id == 'acc1'
+    assert warmed_up == [((GENERAL,), ['US'])]
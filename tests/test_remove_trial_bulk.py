@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+import utilities.db_and_queries.connections_and_queries as connections_and_queries
+import utilities.handlers as handlers
+from consts import *
+from utilities.cache import _caches
+
+# the EU rows: vendors v1 and v2 share account acc1, whose account tenant at1 has one tenant configuration;
+# v3 belongs to acc3, which has none
+VENDORS = [
+    {'id': 'v1', 'accountId': 'acc1'},
+    {'id': 'v2', 'accountId': 'acc1'},
+    {'id': 'v3', 'accountId': 'acc3'},
+]
+ACCOUNTS = [
+    {'id': 'acc1', 'name': 'Acme', 'accountTenantId': 'at1'},
+    {'id': 'acc3', 'name': 'Trial-less', 'accountTenantId': 'at3'},
+]
+TENANT_CONFIGURATIONS = [{'id': 'cfg1', 'tenantId': 'at1'}]
+# IN (...) query -> (rows, column matched by the IN values)
+IN_QUERIES = {
+    GET_ACCOUNT_IDS_BY_VENDOR_IDS: (VENDORS, 'id'),
+    GET_ACCOUNTS_DETAILS_BY_IDS: (ACCOUNTS, 'id'),
+    GET_TENANT_CONFIGURATIONS_BY_TENANT_IDS: (TENANT_CONFIGURATIONS, 'tenantId'),
+}
+
+
+class FakeRegions:
+    def __init__(self):
+        # region -> the query that fails there
+        self.failing = {}
+        self.unreachable = set()
+        self.removed = []
+
+    async def get_db_pool(self, db_type=GENERAL, region='EU'):
+        if region in self.unreachable:
+            raise ConnectionError(f'cannot reach {region}')
+
+        return (db_type, region)
+
+    async def fetch_all_query(self, db_pool, query, args=None):
+        await asyncio.sleep(0)
+        _, region = db_pool
+
+        for template, (rows, column) in IN_QUERIES.items():
+            if query.startswith(template.split('{}')[0]):
+                if self.failing.get(region) == template:
+                    return None
+
+                return [dict(row) for row in rows if row[column] in args] if region == 'EU' else []
+
+        raise AssertionError(f'unexpected query: {query}')
+
+    async def remove_trial_request(self, tenant_id, id):
+        self.removed.append((tenant_id, id))
+        return 200
+
+
+@pytest.fixture
+def regions(monkeypatch):
+    fake = FakeRegions()
+
+    monkeypatch.setattr(handlers, 'get_db_pool', fake.get_db_pool)
+    monkeypatch.setattr(handlers, 'remove_trial_request', fake.remove_trial_request)
+    monkeypatch.setattr(connections_and_queries, 'fetch_all_query', fake.fetch_all_query)
+    monkeypatch.setattr(handlers, 'REGIONS', ['EU', 'US'])
+
+    for cache in _caches.values():
+        cache.clear()
+
+    return fake
+
+
+def _remove(vendor_ids, region=None, dry_run=False):
+    return asyncio.run(handlers.remove_trial_bulk_process(vendor_ids=vendor_ids, region=region, dry_run=dry_run))
+
+
+def _errors(result):
+    return {vendor.get('vendor_id'): vendor.get('error') for vendor in result.get('vendors')}
+
+
+def test_vendors_of_one_account_update_its_configuration_once(regions):
+    result = _remove(vendor_ids=['v1', 'v2', 'v3'])
+
+    assert regions.removed == [('at1', 'cfg1')]
+    assert result['found'] == 2 and result['removed'] == 2
+    assert _errors(result) == {'v1': None, 'v2': None, 'v3': 'vendor or tenant configuration was not found'}
+
+
+def test_a_failed_region_does_not_fail_the_others(regions):
+    regions.unreachable.add('US')
+
+    result = _remove(vendor_ids=['v1', 'v-unknown'])
+
+    assert regions.removed == [('at1', 'cfg1')]
+    assert _errors(result) == {'v1': None, 'v-unknown': 'lookup failed in US'}
+
+
+def test_a_failed_configuration_query_is_not_reported_as_no_configuration(regions):
+    regions.failing['EU'] = GET_TENANT_CONFIGURATIONS_BY_TENANT_IDS
+
+    result = _remove(vendor_ids=['v1'], region='EU', dry_run=True)
+
+    assert result['found'] == 0
+    assert _errors(result) == {'v1': 'lookup failed in EU'}
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+import utilities.account_tree as account_tree
+import utilities.handlers as handlers
+from consts import *
+from models.models import TreeOptions
+
+VENDOR_ID = 'v1'
+TENANTS_ONLY = TreeOptions(sso=False, saml=False)
+# the tenants of the vendor, already in accountId order
+TENANT_IDS = [f't{index}' for index in range(1, 6)]
+
+
+class FakeTenants:
+    def __init__(self):
+        self.failing = False
+
+    async def get_db_pool(self, db_type=GENERAL, region='EU'):
+        return (db_type, region)
+
+    async def fetch_all_query(self, db_pool, query, args=None):
+        # the keyset page query: WHERE vendorId=%s AND accountId>%s ORDER BY accountId LIMIT %s
+        assert query == GET_TENANTS_PAGE_BY_VENDOR_ID
+
+        if self.failing:
+            return None
+
+        vendor_id, after, limit = args
+
+        return [{'accountId': tenant_id, 'vendorId': vendor_id} for tenant_id in TENANT_IDS if tenant_id > after][:limit]
+
+
+@pytest.fixture
+def tenants(monkeypatch):
+    fake = FakeTenants()
+
+    async def fetch_vendor_by_id_from_db(vendor_id, region=None):
+        return {'id': vendor_id, 'accountId': 'acc1', 'region': 'EU'} if vendor_id == VENDOR_ID else None
+
+    monkeypatch.setattr(handlers, 'get_db_pool', fake.get_db_pool)
+    monkeypatch.setattr(handlers, '_fetch_vendor_by_id_from_db', fetch_vendor_by_id_from_db)
+    monkeypatch.setattr(account_tree, 'fetch_all_query', fake.fetch_all_query)
+    monkeypatch.setenv('PROD_VENDOR_ID', 'prod')
+
+    return fake
+
+
+def _page(page_size, cursor=None, vendor_id=VENDOR_ID):
+    return asyncio.run(handlers.get_tenants_page_by_vendor_id(vendor_id=vendor_id, page_size=page_size, cursor=cursor, options=TENANTS_ONLY))
+
+
+def test_pages_walk_every_tenant_once_and_end_without_a_cursor(tenants):
+    pages = [_page(page_size=2)]
+
+    while pages[-1]['next_cursor']:
+        pages.append(_page(page_size=2, cursor=pages[-1]['next_cursor']))
+
+    assert [[tenant.id for tenant in page['tenants']] for page in pages] == [['t1', 't2'], ['t3', 't4'], ['t5']]
+
+
+def test_a_full_last_page_has_no_next_cursor(tenants):
+    page = _page(page_size=5)
+
+    assert len(page['tenants']) == 5
+    assert page['next_cursor'] is None
+
+
+@pytest.mark.parametrize('cursor', ['not base64!', 'eyJ2ZW5kb3JJZCI6InYxIn0', 'WzEsMl0'])
+def test_an_invalid_cursor_is_refused(tenants, cursor):
+    # garbage, a payload without `after`, and a JSON list
+    assert _page(page_size=2, cursor=cursor) == {'error': 'Invalid cursor'}
+
+
+def test_a_cursor_of_another_vendor_is_refused(tenants):
+    cursor = _page(page_size=2)['next_cursor']
+
+    assert _page(page_size=2, cursor=cursor, vendor_id='v2') == {'error': 'Invalid cursor'}
+
+
+def test_a_failed_page_query_is_an_error_not_an_empty_last_page(tenants):
+    tenants.failing = True
+
+    assert _page(page_size=2) == {'error': 'tenants page could not be loaded'}
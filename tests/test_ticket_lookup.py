@@ -0,0 +1,63 @@
+import asyncio
+
+from flask import Flask
+
+import utilities.handlers as handlers
+
+PROD_VENDOR_ID = '00000000-0000-4000-8000-00000000f00d'
+
+
+def _run(coro):
+    # inside an app context, as in a request, so a stray `jsonify` would build a Response instead of raising
+    with Flask(__name__).app_context():
+        return asyncio.run(coro)
+
+
+def _stub_ticket(monkeypatch, emails):
+    async def get_auth_header_from_zendesk_api(email, api_token):
+        return {}
+
+    async def get_users_from_zd_ticket(auth_header, ticket_number, use_cache=True):
+        return {'users': []}
+
+    async def get_ticket_emails_from_zd_dict(res_dict):
+        return {'Customer': emails}
+
+    async def resolve_email_joined(email, context):
+        # the email belongs to a user of Frontegg's own production vendor
+        context.region = 'EU'
+        context.user = {'id': 'user', 'tenantId': 'tenant', 'region': 'EU'}
+        context.account = {'id': 'prod-account'}
+        context.vendor = {'id': PROD_VENDOR_ID, 'accountId': 'prod-account'}
+
+    monkeypatch.setenv('PROD_VENDOR_ID', PROD_VENDOR_ID)
+    monkeypatch.setattr(handlers, 'EMAIL_JOINED_RESOLUTION', True)
+    monkeypatch.setattr(handlers, 'get_auth_header_from_zendesk_api', get_auth_header_from_zendesk_api)
+    monkeypatch.setattr(handlers, 'get_users_from_zd_ticket', get_users_from_zd_ticket)
+    monkeypatch.setattr(handlers, 'get_ticket_emails_from_zd_dict', get_ticket_emails_from_zd_dict)
+    monkeypatch.setattr(handlers, '_resolve_email_joined', resolve_email_joined)
+
+
+def test_prod_vendor_guard_returns_error_dict(monkeypatch):
+    monkeypatch.setenv('PROD_VENDOR_ID', PROD_VENDOR_ID)
+
+    account = _run(handlers.get_all_account_data_by_vendor_id(vendor_id=PROD_VENDOR_ID, use_cache=False))
+
+    assert isinstance(account, dict)
+    assert 'error' in account
+
+
+def test_ticket_email_of_prod_vendor_is_not_an_account(monkeypatch):
+    _stub_ticket(monkeypatch, emails=['someone@frontegg.com'])
+
+    account = _run(handlers.get_all_account_data_by_zendesk_ticket_number(ticket_number='1', use_cache=False))
+
+    assert account == {'error': 'ticket was not found'}
+
+
+def test_ticket_email_of_prod_vendor_with_all_accounts(monkeypatch):
+    _stub_ticket(monkeypatch, emails=['someone@frontegg.com', 'other@frontegg.com'])
+
+    accounts = _run(handlers.get_all_account_data_by_zendesk_ticket_number(ticket_number='1', use_cache=False, all_accounts=True))
+
+    assert accounts == {'error': 'ticket was not found'}
@@ -0,0 +1,160 @@
+from typing import Any, Iterable, Optional, Tuple
+
+from consts import ACCOUNT_ALIAS_CACHE_MAX_SIZE, ACCOUNT_TREE_CACHE_MAX_SIZE, ACCOUNT_TREE_CACHE_TTL, RESPONSE_ETAG_CACHE_MAX_SIZE
+from models.models import FULL_TREE, TreeOptions
+from utilities.cache import TTLCache
+
+ALIAS_VENDOR = 'vendor'
+ALIAS_TENANT = 'tenant'
+ALIAS_EMAIL = 'email'
+
+account_tree_cache = TTLCache(name='account_tree', maxsize=ACCOUNT_TREE_CACHE_MAX_SIZE, ttl=ACCOUNT_TREE_CACHE_TTL)
+account_aliases = TTLCache(name='account_aliases', maxsize=ACCOUNT_ALIAS_CACHE_MAX_SIZE, ttl=ACCOUNT_TREE_CACHE_TTL)
+# (account ID, fieldsets) -> (account, etag) of the cached trees already serialized; the entries of an account go
+# whenever its tree is replaced or invalidated, so they never keep an old tree alive
+account_etags = TTLCache(name='account_etags', maxsize=RESPONSE_ETAG_CACHE_MAX_SIZE, ttl=ACCOUNT_TREE_CACHE_TTL)
+
+
+def get_cached_account(account_id: str, options: TreeOptions = FULL_TREE, region: Optional[str] = None) -> Optional[Any]:
+    """
+    Returns the cached account tree of an account.
+
+    The full tree answers every options, since the fields it has beyond them are filtered out when it is serialized.
+    Partial trees are cached under the account ID and their options and only answer the same options.
+
+    Args:
+        account_id (str): The account ID.
+        options (TreeOptions, optional): The subtrees the tree must have. Defaults to FULL_TREE.
+        region (Optional[str], optional): The region the caller asked for. A tree of another region is not returned. Defaults to None (any region).
+
+    Returns:
+        Optional[Any]: The cached `Account`, or None if it is not cached, expired or of another region.
+    """
+    if not account_id:
+        return None
+
+    account = account_tree_cache.get(account_id)
+
+    if account is None and options != FULL_TREE:
+        account = account_tree_cache.get((account_id, options))
+
+    if account is not None and region and (getattr(account, 'region', None) or '').upper() != region.upper():
+        return None
+
+    return account
+
+def get_cached_account_by_alias(kind: str, key: str, options: TreeOptions = FULL_TREE, region: Optional[str] = None) -> Optional[Any]:
+    """
+    Returns the cached account tree a vendor ID, tenant ID or email belongs to.
+
+    Args:
+        kind (str): The kind of key, one of the ALIAS_* constants.
+        key (str): The vendor ID, tenant ID or email.
+        options (TreeOptions, optional): The subtrees the tree must have. Defaults to FULL_TREE.
+        region (Optional[str], optional): The region the caller asked for. Defaults to None (any region).
+
+    Returns:
+        Optional[Any]: The cached `Account`, or None if it is not cached, expired or of another region.
+    """
+    account_id = get_account_id_by_alias(kind=kind, key=key)
+
+    return get_cached_account(account_id=account_id, options=options, region=region)
+
+def get_account_id_by_alias(kind: str, key: str) -> Optional[str]:
+    """
+    Returns the account ID a vendor ID, tenant ID or email was last resolved to.
+
+    Args:
+        kind (str): The kind of key, one of the ALIAS_* constants.
+        key (str): The vendor ID, tenant ID or email.
+
+    Returns:
+        Optional[str]: The account ID, or None if it is unknown.
+    """
+    if not key:
+        return None
+
+    return account_aliases.get((kind, key))
+
+def alias_account(kind: str, key: str, account_id: str) -> None:
+    """
+    Records which account a vendor ID, tenant ID or email belongs to.
+
+    Args:
+        kind (str): The kind of key, one of the ALIAS_* constants.
+        key (str): The vendor ID, tenant ID or email.
+        account_id (str): The account ID.
+    """
+    if key and account_id:
+        account_aliases.set((kind, key), account_id)
+
+def cache_account(account_id: str, account_data: Any, vendor_ids: Iterable[str] = (), tenant_ids: Iterable[str] = (), options: TreeOptions = FULL_TREE) -> None:
+    """
+    Stores an assembled account tree and maps its vendor and tenant IDs to it.
+
+    Args:
+        account_id (str): The account ID.
+        account_data (Any): The `Account` returned by `get_all_account_data_by_vendor_id`.
+        vendor_ids (Iterable[str], optional): The vendor IDs of the account. Defaults to ().
+        tenant_ids (Iterable[str], optional): The tenant IDs of the account. Defaults to ().
+        options (TreeOptions, optional): The subtrees the tree was built with. Defaults to FULL_TREE.
+    """
+    if not account_id:
+        return
+
+    account_tree_cache.set(account_id if options == FULL_TREE else (account_id, options), account_data)
+    _drop_account_etags(account_id=account_id)
+
+    for vendor_id in vendor_ids:
+        alias_account(kind=ALIAS_VENDOR, key=vendor_id, account_id=account_id)
+
+    for tenant_id in tenant_ids:
+        alias_account(kind=ALIAS_TENANT, key=tenant_id, account_id=account_id)
+
+def invalidate_account(account_id: Optional[str] = None, vendor_id: Optional[str] = None) -> None:
+    """
+    Drops the cached trees (the full one and the partial ones) of an account after it was mutated.
+
+    The aliases are kept: they still point to the right account and the next lookup rebuilds the tree.
+
+    Args:
+        account_id (Optional[str], optional): The account ID. Defaults to None.
+        vendor_id (Optional[str], optional): A vendor ID of the account, used when the account ID is unknown. Defaults to None.
+    """
+    if not account_id and vendor_id:
+        account_id = get_account_id_by_alias(kind=ALIAS_VENDOR, key=vendor_id)
+
+    if account_id:
+        account_tree_cache.pop(account_id)
+        account_tree_cache.pop_where(lambda key, _: isinstance(key, tuple) and key[0] == account_id)
+        _drop_account_etags(account_id=account_id)
+
+def get_account_etag(account: Any, fieldsets: Tuple = ()) -> Optional[str]:
+    """
+    Returns the ETag an account tree was last served with.
+
+    Args:
+        account (Any): The `Account`.
+        fieldsets (Tuple, optional): The fieldsets it was serialized with. Defaults to ().
+
+    Returns:
+        Optional[str]: The ETag, or None if this very tree was not served yet (a rebuilt tree has a new entry).
+    """
+    known = account_etags.get((account.id, fieldsets))
+
+    return known[1] if known and known[0] is account else None
+
+def remember_account_etag(account: Any, etag: str, fieldsets: Tuple = ()) -> None:
+    """
+    Records the ETag of a served account tree, so a later 304 for it is answered without serializing it.
+
+    Args:
+        account (Any): The `Account`.
+        etag (str): The ETag of its body.
+        fieldsets (Tuple, optional): The fieldsets it was serialized with. Defaults to ().
+    """
+    if account.id:
+        account_etags.set((account.id, fieldsets), (account, etag))
+
+def _drop_account_etags(account_id: str) -> None:
+    account_etags.pop_where(lambda key, _: key[0] == account_id)
@@ -0,0 +1,295 @@
+import asyncio
+import dataclasses
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiomysql
+
+from consts import *
+from models.models import FULL_TREE, Account, SAML_groups, SSO_configs, Tenant, TreeOptions, Vendor, saml_group_from_row, sso_config_from_row, tenant_from_row, vendor_from_row
+from utilities.db_and_queries.connections_and_queries import QueryError, build_in_clause_chunks, fetch_all_in_chunks, fetch_all_query, iter_query
+
+TREE_SUBTREES = ('tenants', 'sso', 'saml')
+TREE_MODELS = {
+    'account': Account,
+    'vendor': Vendor,
+    'tenant': Tenant,
+    'sso_config': SSO_configs,
+    'saml_group': SAML_groups,
+}
+
+
+def parse_tree_options(include: Optional[List[str]] = None, fields: Optional[Dict[str, List[str]]] = None) -> Optional[TreeOptions]:
+    """
+    Validates the `include` and `fields` options of a lookup and normalizes them to TreeOptions.
+
+    A subtree is only loaded if it is included and its field is returned: vendors without `tenants` in their fields
+    load no tenants, and tenants without `sso_configs` or `saml_groups` load no SSO configurations or SAML groups.
+    The fields of the subtrees that are not loaded are left out of the output.
+
+    Args:
+        include (Optional[List[str]], optional): The subtrees to load, out of TREE_SUBTREES. Defaults to None (all of them).
+        fields (Optional[Dict[str, List[str]]], optional): The fields to return for each kind of model in TREE_MODELS. Defaults to None (all of them).
+
+    Returns:
+        Optional[TreeOptions]: The options, or None if they are not valid.
+    """
+    include = TREE_SUBTREES if include is None else include
+    fields = fields or {}
+
+    if not isinstance(include, list) and include is not TREE_SUBTREES or any(name not in TREE_SUBTREES for name in include):
+        return None
+
+    if not isinstance(fields, dict):
+        return None
+
+    fieldsets = {}
+
+    for kind, names in fields.items():
+        model = TREE_MODELS.get(kind)
+
+        if model is None or not isinstance(names, list):
+            return None
+
+        model_fields = {field.name for field in dataclasses.fields(model)}
+
+        if not all(isinstance(name, str) and name in model_fields for name in names):
+            return None
+
+        fieldsets[model] = frozenset(names)
+
+    def _returned(model: type, name: str) -> bool:
+        return model not in fieldsets or name in fieldsets[model]
+
+    def _leave_out(model: type, name: str) -> None:
+        fieldsets[model] = fieldsets.get(model, frozenset(field.name for field in dataclasses.fields(model))) - {name}
+
+    tenants = 'tenants' in include and _returned(Account, 'vendors') and _returned(Vendor, 'tenants')
+    sso = tenants and 'sso' in include and _returned(Tenant, 'sso_configs')
+    saml = tenants and 'saml' in include and _returned(Tenant, 'saml_groups')
+
+    if not tenants:
+        _leave_out(Vendor, 'tenants')
+    else:
+        if not sso:
+            _leave_out(Tenant, 'sso_configs')
+        if not saml:
+            _leave_out(Tenant, 'saml_groups')
+
+    return TreeOptions(
+        tenants=tenants,
+        sso=sso,
+        saml=saml,
+        fieldsets=tuple(sorted(fieldsets.items(), key=lambda item: item[0].__name__)),
+    )
+
+def _group_rows(rows: List[Dict[str, Any]], key: str) -> Dict[Any, List[Dict[str, Any]]]:
+    grouped = {}
+
+    for row in rows:
+        grouped.setdefault(row.get(key), []).append(row)
+
+    return grouped
+
+async def load_vendors_by_account_id(account_id: str, db_pool: aiomysql.pool.Pool, options: TreeOptions = FULL_TREE) -> List[Vendor]:
+    """
+    Retrieves the full list of Vendor objects of an account with one query per tree level.
+
+    This is the batched counterpart of `_fetch_all_vendors_by_account_id_from_db`: vendors, tenants, SSO domains,
+    SSO configurations and SAML groups are each fetched with a single `WHERE ... IN (...)` query (chunked for very
+    large sets) and the models are assembled in memory, producing the same tree.
+    The subtrees left out by the options are not queried and stay None.
+
+    Args:
+        account_id (str): The account ID to search for.
+        db_pool (aiomysql.pool.Pool): The database connection pool.
+        options (TreeOptions, optional): The subtrees to load. Defaults to FULL_TREE.
+
+    Returns:
+        List[Vendor]: A list of Vendor objects.
+    """
+    vendors_res = await fetch_all_query(db_pool=db_pool, query=GET_VENDORS_IDS_BY_ACCOUNT_ID_QUERY, args=(account_id,))
+
+    if vendors_res is None:
+        raise QueryError(f'the vendors of account {account_id} could not be fetched')
+
+    vendors_list = [vendor_from_row(vendor) for vendor in vendors_res]
+
+    if not options.tenants:
+        return vendors_list
+
+    tenants_by_vendor_id = await load_tenants_by_vendor_ids(vendor_ids=[vendor.id for vendor in vendors_list], db_pool=db_pool, options=options)
+
+    for vendor_obj in vendors_list:
+        vendor_obj.tenants = tenants_by_vendor_id.get(vendor_obj.id, [])
+
+    return vendors_list
+
+async def load_tenants_by_vendor_ids(vendor_ids: List[str], db_pool: aiomysql.pool.Pool, options: TreeOptions = FULL_TREE) -> Dict[str, List[Tenant]]:
+    """
+    Retrieves the Tenant objects of several vendors, including their SSO configurations and SAML groups.
+
+    Tenant rows are streamed with `iter_query` and turned into Tenant objects as they arrive, so a vendor with
+    a very large number of tenants is not materialized as a list of row dictionaries first. The `IN (...)` chunks
+    are streamed concurrently, and a query error is raised rather than returning the tenants read so far.
+    SSO configurations and SAML groups left out by the options are not queried and stay None.
+
+    Args:
+        vendor_ids (List[str]): The vendor IDs to search for.
+        db_pool (aiomysql.pool.Pool): The database connection pool.
+        options (TreeOptions, optional): The subtrees to load. Defaults to FULL_TREE.
+
+    Returns:
+        Dict[str, List[Tenant]]: The tenants of each vendor, keyed by vendor ID.
+    """
+    async def _load_chunk(chunk_query: str, chunk_args: Tuple[Any, ...]) -> List[Tenant]:
+        return [tenant_from_row(tenant) async for tenant in iter_query(db_pool=db_pool, query=chunk_query, args=chunk_args)]
+
+    # the chunks are streamed concurrently; a failed chunk raises instead of leaving its tenants out
+    chunks = await asyncio.gather(*[
+        _load_chunk(chunk_query, chunk_args)
+        for chunk_query, chunk_args in build_in_clause_chunks(query=GET_ALL_TENANTS_BY_VENDOR_IDS, values=vendor_ids)
+    ])
+    tenants_list = [tenant_obj for chunk in chunks for tenant_obj in chunk]
+
+    await attach_tenant_subtrees(tenants_list=tenants_list, db_pool=db_pool, options=options)
+
+    tenants_by_vendor_id = {}
+
+    for tenant_obj in tenants_list:
+        tenants_by_vendor_id.setdefault(tenant_obj.vendor_id, []).append(tenant_obj)
+
+    return tenants_by_vendor_id
+
+async def load_tenants_page(vendor_id: str, db_pool: aiomysql.pool.Pool, page_size: int, after: str = '', options: TreeOptions = FULL_TREE) -> Tuple[List[Tenant], Optional[str]]:
+    """
+    Retrieves one page of the Tenant objects of a vendor, in tenant ID order, including their SSO configurations and SAML groups.
+
+    The page is selected in SQL by keyset (`accountId > after ... LIMIT`), not by offset, so a deep page costs the
+    same as the first one. One extra row is read to tell whether there is a next page.
+
+    Args:
+        vendor_id (str): The vendor ID to search for.
+        db_pool (aiomysql.pool.Pool): The database connection pool.
+        page_size (int): The number of tenants per page.
+        after (str, optional): The last tenant ID of the previous page. Defaults to '' (the first page).
+        options (TreeOptions, optional): The subtrees to load. Defaults to FULL_TREE.
+
+    Returns:
+        Tuple[List[Tenant], Optional[str]]: The tenants of the page, and the tenant ID the next page starts after,
+            or None if this is the last page.
+
+    Raises:
+        QueryError: If a query of the page fails, so a failure is not mistaken for an empty last page.
+    """
+    tenants_res = await fetch_all_query(db_pool=db_pool, query=GET_TENANTS_PAGE_BY_VENDOR_ID, args=(vendor_id, after, page_size + 1))
+
+    if tenants_res is None:
+        raise QueryError(f'the tenants page of vendor {vendor_id} could not be fetched')
+
+    tenants_list = [tenant_from_row(tenant) for tenant in tenants_res[:page_size]]
+    next_after = tenants_list[-1].id if len(tenants_res) > page_size else None
+
+    await attach_tenant_subtrees(tenants_list=tenants_list, db_pool=db_pool, options=options)
+
+    return tenants_list, next_after
+
+async def attach_tenant_subtrees(tenants_list: List[Tenant], db_pool: aiomysql.pool.Pool, options: TreeOptions = FULL_TREE) -> None:
+    """
+    Loads the SSO configurations and SAML groups of Tenant objects with one query per level and assigns them.
+
+    Args:
+        tenants_list (List[Tenant]): The tenants.
+        db_pool (aiomysql.pool.Pool): The database connection pool.
+        options (TreeOptions, optional): The subtrees to load; the others are not queried and stay None. Defaults to FULL_TREE.
+    """
+    sso_by_tenant_id = {}
+    saml_groups_by_config_id = {}
+
+    if options.sso or options.saml:
+        # the SAML groups hang off the SSO domains' configuration IDs, so the domains are queried for either
+        sso_by_tenant_id = await load_sso_configs_by_tenant_ids(
+            tenant_ids=[tenant_obj.id for tenant_obj in tenants_list],
+            db_pool=db_pool,
+            with_configs=options.sso
+        )
+
+    if options.saml:
+        saml_groups_by_config_id = await load_saml_groups_by_config_ids(
+            config_ids=[config_id for _, config_id in sso_by_tenant_id.values()],
+            db_pool=db_pool
+        )
+
+    for tenant_obj in tenants_list:
+        sso_config_list, config_id = sso_by_tenant_id.get(tenant_obj.id, ([], ''))
+
+        if options.sso:
+            tenant_obj.sso_configs = sso_config_list
+        if options.saml:
+            tenant_obj.saml_groups = saml_groups_by_config_id.get(config_id, []) if config_id else []
+
+async def load_sso_configs_by_tenant_ids(tenant_ids: List[str], db_pool: aiomysql.pool.Pool, with_configs: bool = True) -> Dict[str, Tuple[List[SSO_configs], str]]:
+    """
+    Retrieves the SSO configurations and the SSO configuration ID of several tenants.
+
+    Like `_fetch_sso_configs_by_account_id_from_db`, the configurations of a tenant are those of its last SSO domain
+    that has a configuration, and the configuration ID is the one of its last SSO domain.
+
+    Args:
+        tenant_ids (List[str]): The tenant IDs to search for.
+        db_pool (aiomysql.pool.Pool): The database connection pool.
+        with_configs (bool, optional): Whether to fetch the configurations too, or only the configuration IDs. Defaults to True.
+
+    Returns:
+        Dict[str, Tuple[List[SSO_configs], str]]: The SSO configuration objects and the SSO configuration ID of each tenant, keyed by tenant ID.
+    """
+    domains_res = await fetch_all_in_chunks(db_pool=db_pool, query=GET_SSO_DOMAINS_BY_TENANT_IDS, values=tenant_ids, raise_on_error=True)
+    domains_by_tenant_id = _group_rows(rows=domains_res, key='tenantId')
+
+    configs_res = await fetch_all_in_chunks(
+        db_pool=db_pool,
+        query=GET_SSO_CONFIGS_BY_SSO_CONFIG_IDS,
+        values=[domain.get('ssoConfigId') for domain in domains_res if domain.get('ssoConfigId')] if with_configs else [],
+        raise_on_error=True
+    )
+    configs_by_id = _group_rows(rows=configs_res, key='id')
+
+    sso_by_tenant_id = {}
+
+    for tenant_id, domains_list in domains_by_tenant_id.items():
+        config_id = ''
+        sso_configs_list = []
+
+        for domain_row in domains_list:
+            config_id = domain_row.get('ssoConfigId')
+
+            if config_id:
+                sso_configs_list = configs_by_id.get(config_id, [])
+
+        sso_by_tenant_id[tenant_id] = ([sso_config_from_row(sso_config) for sso_config in sso_configs_list], config_id)
+
+    return sso_by_tenant_id
+
+async def load_saml_groups_by_config_ids(config_ids: List[str], db_pool: aiomysql.pool.Pool) -> Dict[str, List[SAML_groups]]:
+    """
+    Retrieves the SAML group objects of several SSO configurations.
+
+    Args:
+        config_ids (List[str]): The SSO configuration IDs to search for.
+        db_pool (aiomysql.pool.Pool): The database connection pool.
+
+    Returns:
+        Dict[str, List[SAML_groups]]: The SAML group objects of each SSO configuration, keyed by SSO configuration ID.
+    """
+    saml_groups = await fetch_all_in_chunks(
+        db_pool=db_pool,
+        query=GET_SAML_GROUPS_BY_SSO_CONFIG_IDS,
+        values=[config_id for config_id in config_ids if config_id],
+        raise_on_error=True
+    )
+
+    saml_groups_by_config_id = {}
+
+    for saml_group in saml_groups:
+        saml_groups_by_config_id.setdefault(saml_group.get('samlConfigId'), []).append(saml_group_from_row(saml_group))
+
+    return saml_groups_by_config_id
@@ -0,0 +1,148 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+_caches: Dict[str, 'TTLCache'] = {}
+
+
+class TTLCache:
+    """
+    A size-bounded LRU cache whose entries expire after a time-to-live.
+
+    Every cache registers itself by name so its statistics can be reported by `all_cache_stats`.
+    The caches are only touched from the background event loop, so they need no locking.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        _caches[name] = self
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Returns the value of a key and marks it as recently used.
+
+        Args:
+            key (Hashable): The key to look up.
+            default (Any, optional): The value to return on a miss or an expired entry. Defaults to None.
+
+        Returns:
+            Any: The cached value, or `default`.
+        """
+        entry = self._entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return default
+
+        value, expires_at = entry
+
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Stores a value, evicting the least recently used entries when the cache is full.
+
+        Args:
+            key (Hashable): The key to store.
+            value (Any): The value to store.
+            ttl (Optional[float], optional): Time-to-live of this entry in seconds. Defaults to the cache's ttl.
+        """
+        self._entries[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Removes a key.
+
+        Args:
+            key (Hashable): The key to remove.
+            default (Any, optional): The value to return if the key is not cached. Defaults to None.
+
+        Returns:
+            Any: The removed value, or `default`.
+        """
+        entry = self._entries.pop(key, None)
+
+        return default if entry is None else entry[0]
+
+    def pop_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """
+        Removes every entry for which `predicate(key, value)` is true.
+
+        Args:
+            predicate (Callable[[Hashable, Any], bool]): The condition for removal.
+
+        Returns:
+            int: The number of removed entries.
+        """
+        keys = [key for key, (value, _) in self._entries.items() if predicate(key, value)]
+
+        for key in keys:
+            del self._entries[key]
+
+        return len(keys)
+
+    def clear(self) -> None:
+        """
+        Removes every entry.
+        """
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the counters of the cache.
+
+        Returns:
+            Dict[str, Any]: Size, limits, hits, misses, hit rate, evictions and expirations.
+        """
+        lookups = self.hits + self.misses
+
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+
+        return entry is not None and entry[1] > time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def all_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Returns the statistics of every cache of the process, keyed by cache name.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: The statistics of each cache.
+    """
+    return {name: cache.stats() for name, cache in _caches.items()}
@@ -0,0 +1,80 @@
+import gzip
+from typing import Optional
+
+from flask import Response, request
+
+from consts import BROTLI_COMPRESSION_QUALITY, COMPRESSION_MIN_SIZE, GZIP_COMPRESSION_LEVEL
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def choose_encoding() -> Optional[str]:
+    """
+    Picks the content encoding of the response from the request's `Accept-Encoding`.
+
+    Brotli is preferred when the client accepts it and the `brotli` package is installed, then gzip.
+
+    Returns:
+        Optional[str]: 'br', 'gzip', or None to send the body as is.
+    """
+    accepted = request.accept_encodings
+
+    if brotli is not None and accepted.quality('br') > 0:
+        return 'br'
+
+    if accepted.quality('gzip') > 0:
+        return 'gzip'
+
+    return None
+
+def compress_response(response: Response) -> Response:
+    """
+    Compresses a JSON response body with the encoding the client accepts, as an `after_request` hook.
+
+    Bodies under COMPRESSION_MIN_SIZE are not worth the CPU and are sent as is, and so are streamed responses,
+    whose body is produced while it is being sent.
+
+    Args:
+        response (Response): The response of the view.
+
+    Returns:
+        Response: The same response, compressed if applicable.
+    """
+    response.vary.add('Accept-Encoding')
+
+    if (
+        response.status_code != 200
+        or response.mimetype != 'application/json'
+        or response.is_streamed
+        or response.direct_passthrough
+        or 'Content-Encoding' in response.headers
+    ):
+        return response
+
+    body = response.get_data()
+
+    if len(body) < COMPRESSION_MIN_SIZE:
+        return response
+
+    encoding = choose_encoding()
+
+    if encoding == 'br':
+        response.set_data(brotli.compress(body, quality=BROTLI_COMPRESSION_QUALITY))
+    elif encoding == 'gzip':
+        # mtime=0 keeps the output deterministic for the same body
+        response.set_data(gzip.compress(body, compresslevel=GZIP_COMPRESSION_LEVEL, mtime=0))
+    else:
+        return response
+
+    response.headers['Content-Encoding'] = encoding
+
+    etag, is_weak = response.get_etag()
+
+    if etag and not is_weak:
+        # the bytes sent are no longer the ones the strong ETag was computed on (nginx does the same on gzip)
+        response.set_etag(etag, weak=True)
+
+    return response
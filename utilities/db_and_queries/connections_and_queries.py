@@ -1,37 +1,19 @@
-from typing import Any, Callable, Dict, Optional, Tuple, List, Union
+import asyncio
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Tuple, List, Union
 import mysql.connector
 from consts import *
 import aiomysql
 import os
 from dotenv import load_dotenv
 
-load_dotenv('.env')
+from utilities.db_and_queries.pool_registry import get_db_pool
 
-async def connect_to_db(user_name: str, host: str, passwd: str) -> aiomysql.pool.Pool:
-    """
-    Establish a connection to the database and return a connection pool.
+load_dotenv('.env')
 
-    This function retrieves the database connection credentials from the environment variables
-    and creates a connection pool using aiomysql.
 
-    Args:
-        user_name (str): The environment variable key for the database username.
-        host (str): The environment variable key for the database host.
-        passwd (str): The environment variable key for the database password.
+class QueryError(Exception):
+    """Raised by the strict helpers when a query failed, so the failure cannot pass for an empty result."""
 
-    Returns:
-        aiomysql.pool.Pool: A connection pool for interacting with the database.
-    """
-    user_name = os.getenv(user_name)
-    host = os.getenv(host)
-    passwd = os.getenv(passwd)
-    
-    db_pool = await aiomysql.create_pool(
-        user=user_name,
-        host=host,
-        password=passwd
-    )
-    return db_pool
 
 async def fetch_one_query(db_pool: aiomysql.pool.Pool, query: str, args: Any=None):
     """Execute a query and fetch one result row.
@@ -46,18 +28,24 @@ async def fetch_one_query(db_pool: aiomysql.pool.Pool, query: str, args: Any=Non
     """
     try:
         async with db_pool.acquire() as conn:
-            async with conn.cursor() as cur:
-                await cur.execute(query, args)
-                row_data = await cur.fetchone()
-
-                if row_data:
-                    column_names = [desc[0] for desc in cur.description]
-                    row_dict = dict(zip(column_names, row_data))
+            try:
+                async with conn.cursor() as cur:
+                    await cur.execute(query, args)
+                    row_data = await cur.fetchone()
+
+                    if row_data:
+                        column_names = [desc[0] for desc in cur.description]
+                        row_dict = dict(zip(column_names, row_data))
+                        
+                        return row_dict
                     
-                    return row_dict
-                
-                else:
-                    return None
+                    else:
+                        return None
+                    
+            except asyncio.CancelledError:
+                # a query cancelled mid-flight leaves unread packets behind, never hand it back to the pool
+                conn.close()
+                raise
                 
     except aiomysql.Error as e:
         print(f"MySQL Error: {e}")
@@ -82,14 +70,19 @@ async def fetch_all_query(db_pool: aiomysql.pool.Pool, query: str, args: Any=Non
     """
     try:
         async with db_pool.acquire() as conn:
-            async with conn.cursor() as cur:
-                await cur.execute(query, args)
-                rows = await cur.fetchall()
-                column_names = [desc[0] for desc in cur.description]
+            try:
+                async with conn.cursor() as cur:
+                    await cur.execute(query, args)
+                    rows = await cur.fetchall()
+                    column_names = [desc[0] for desc in cur.description]
 
-                # result_dict = {col: [row[i] for row in rows] for i, col in enumerate(column_names)}
-                # return dict(result_dict)
-                result_list = [dict(zip(column_names, row)) for row in rows]
+                    # result_dict = {col: [row[i] for row in rows] for i, col in enumerate(column_names)}
+                    # return dict(result_dict)
+                    result_list = [dict(zip(column_names, row)) for row in rows]
+                    
+            except asyncio.CancelledError:
+                conn.close()
+                raise
                 
         return result_list
             
@@ -103,12 +96,161 @@ async def fetch_all_query(db_pool: aiomysql.pool.Pool, query: str, args: Any=Non
     finally:
         await db_pool._wakeup()
 
+async def fetch_all_in_chunks(db_pool: aiomysql.pool.Pool, query: str, values: List[Any], chunk_size: int = BATCH_QUERY_CHUNK_SIZE, args: Tuple[Any, ...] = (), raise_on_error: bool = False) -> List[Dict[str,Any]]:
+    """Execute a `WHERE ... IN ({})` query for a list of values, chunking very large lists.
+
+    Duplicate values are sent only once. The `{}` in the query is replaced by one placeholder per value
+    of the chunk and the values are passed as query arguments. Chunks run concurrently, never more at once
+    than the pool has connections.
+
+    Args:
+        db_pool (aiomysql.pool.Pool): The connection pool.
+        query (str): The SQL query to execute, containing a single `IN ({})` clause.
+        values (List[Any]): The values to match.
+        chunk_size (int, optional): Maximum number of values per query. Defaults to BATCH_QUERY_CHUNK_SIZE.
+        args (Tuple[Any, ...], optional): Arguments of the placeholders that follow the `IN ({})` clause. Defaults to ().
+        raise_on_error (bool, optional): Whether a failed chunk raises QueryError instead of being skipped. Defaults to False.
+
+    Returns:
+        List[Dict[str, Any]]: The rows of all chunks, in chunk order. Chunks that fail are logged and skipped,
+            unless `raise_on_error` is set.
+    """
+    semaphore = asyncio.Semaphore(getattr(db_pool, 'maxsize', None) or DB_POOL_MAX_SIZE)
+
+    async def _fetch_chunk(chunk_query: str, chunk_args: Tuple[Any, ...]) -> List[Dict[str,Any]]:
+        async with semaphore:
+            chunk_rows = await fetch_all_query(db_pool=db_pool, query=chunk_query, args=chunk_args)
+
+        if chunk_rows is None and raise_on_error:
+            raise QueryError(f'query failed: {chunk_query[:80]}')
+
+        return chunk_rows or []
+
+    rows = []
+    chunks = build_in_clause_chunks(query=query, values=values, chunk_size=chunk_size, args=args)
+
+    for chunk_rows in await asyncio.gather(*[_fetch_chunk(chunk_query, chunk_args) for chunk_query, chunk_args in chunks]):
+        rows.extend(chunk_rows)
+
+    return rows
+
+def build_in_clause_chunks(query: str, values: List[Any], chunk_size: int = BATCH_QUERY_CHUNK_SIZE, args: Tuple[Any, ...] = ()) -> List[Tuple[str, Tuple[Any, ...]]]:
+    """Split a `WHERE ... IN ({})` query into (query, args) pairs of at most `chunk_size` distinct values.
+
+    Args:
+        query (str): The SQL query, containing a single `IN ({})` clause.
+        values (List[Any]): The values to match. None values and duplicates are dropped.
+        chunk_size (int, optional): Maximum number of values per query. Defaults to BATCH_QUERY_CHUNK_SIZE.
+        args (Tuple[Any, ...], optional): Arguments of the placeholders that follow the `IN ({})` clause,
+            appended to the values of every chunk. Defaults to ().
+
+    Returns:
+        List[Tuple[str, Tuple[Any, ...]]]: The query and the query arguments of each chunk.
+    """
+    unique_values = list(dict.fromkeys(value for value in values if value is not None))
+    chunks = []
+
+    for start in range(0, len(unique_values), chunk_size):
+        chunk = tuple(unique_values[start:start + chunk_size])
+        chunks.append((query.format(', '.join(['%s'] * len(chunk))), chunk + tuple(args)))
+
+    return chunks
+
+async def iter_query(db_pool: aiomysql.pool.Pool, query: str, args: Any = None, batch_size: Optional[int] = None) -> AsyncIterator[Union[Dict[str,Any], List[Dict[str,Any]]]]:
+    """Execute a query with a server-side (unbuffered) cursor and yield the rows as they arrive.
+
+    Unlike `fetch_all_query`, the result set is never materialized: rows are read from the socket
+    `ITER_QUERY_FETCH_SIZE` at a time (or `batch_size` at a time when given) and the column names are resolved once.
+    The connection is held until the generator is exhausted or closed, so consume it without awaiting
+    unrelated work in between. Closing the generator early drops the connection instead of draining the rest
+    of the result set.
+
+    Args:
+        db_pool (aiomysql.pool.Pool): The connection pool.
+        query (str): The SQL query to execute.
+        args (tuple, optional): Query arguments. Defaults to None.
+        batch_size (int, optional): When set, yield lists of up to `batch_size` rows instead of single rows. Defaults to None.
+
+    Yields:
+        dict or list: A row as a dictionary, or a list of row dictionaries when `batch_size` is set.
+
+    Raises:
+        Exception: A query or connection error is logged and re-raised, so a failed stream never looks like a
+            shorter result set.
+    """
+    fetch_size = batch_size or ITER_QUERY_FETCH_SIZE
+
+    try:
+        async with db_pool.acquire() as conn:
+            cur = await conn.cursor(aiomysql.SSCursor)
+            finished = False
+
+            try:
+                await cur.execute(query, args)
+                column_names = [desc[0] for desc in cur.description]
+
+                while True:
+                    rows = await cur.fetchmany(fetch_size)
+
+                    if not rows:
+                        break
+
+                    if batch_size:
+                        yield [dict(zip(column_names, row)) for row in rows]
+                    else:
+                        for row in rows:
+                            yield dict(zip(column_names, row))
+
+                finished = True
+
+            finally:
+                if finished:
+                    await cur.close()
+                else:
+                    # unread rows are still on the wire, drop the connection rather than drain them
+                    conn.close()
+
+    except aiomysql.Error as e:
+        print(f"MySQL Error: {e}")
+        raise
+    except Exception as e:
+        print(f"Unexpected Error: {e}")
+        raise
+
+    finally:
+        await db_pool._wakeup()
+
+async def _check_in_region(func: Callable[..., Any], db_type: str, region: str, *args: Any, **kwargs: Any) -> Optional[Dict[str,str]]:
+    """
+    Runs the fetching function against the shared pool of a single region.
+
+    Args:
+        func (Callable[..., Any]): The function to call for fetching the data.
+        db_type (str): The type of database to connect to.
+        region (str): The region to query.
+        *args: Additional arguments to pass to the function.
+        **kwargs: Additional keyword arguments to pass to the function.
+
+    Returns:
+        Optional[Dict[str, str]]: The fetched data tagged with the region, or None if no data is found.
+    """
+    db_pool = await get_db_pool(db_type=db_type, region=region)
+
+    data = await func(db_pool=db_pool, *args, **kwargs)
+
+    if data:
+        data['region'] = region
+        return data
+
+    return None
+
 async def check_in_all_dbs(func: Callable[..., Tuple[Any, Any]], db_type: Optional[str] = GENERAL, *args: Any, **kwargs: Any) -> Dict[str,str]:
     """
     Check all databases for the requested data using the specified function.
 
-    This function iterates over all regions, connects to the database in each region, and calls the provided function
-    to fetch the data. If data is found, the connection is closed and the data along with the region is returned.
+    This function queries every region concurrently through the shared pools of the pool registry and returns
+    as soon as one region yields data, cancelling the lookups that are still running in the other regions.
+    The latency of a region-less lookup is therefore that of the fastest hit instead of the sum of all regions.
 
     Args:
         func (Callable[..., Tuple[Any, Any]]): The function to call for fetching the data.
@@ -119,19 +261,26 @@ async def check_in_all_dbs(func: Callable[..., Tuple[Any, Any]], db_type: Option
     Returns:
         Dict[str, str]: A dictionary containing the fetched data and the region, or None if no data is found.
     """
-    for region in REGIONS:
-        db_pool  = await connect_to_db(user_name='USER_NAME', host=f'HOST_{db_type}_{region}', passwd=f'PASSWD_{db_type}_{region}')
+    tasks = [
+        asyncio.create_task(_check_in_region(func, db_type, region, *args, **kwargs))
+        for region in REGIONS
+    ]
 
-        data = await func(db_pool=db_pool,*args, **kwargs)
-        
-        if data:
-            db_pool.close()
-            await db_pool.wait_closed()
-            data['region'] = region
-            return data
-        
-        db_pool.close()
-        await db_pool.wait_closed()
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                data = await next_done
+            except Exception as e:
+                print(f"Region lookup Error: {e}")
+                continue
+
+            if data:
+                return data
+
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
 
     return None
 
@@ -139,7 +288,7 @@ async def fetching_account_tenant_id_by_email(db_pool: aiomysql.pool.Pool, email
     """
     Fetch the account tenant ID by email from the database.
 
-    This function constructs and executes a query to fetch the account tenant ID associated with the given email.
+    This function executes a parameterized query to fetch the account tenant ID associated with the given email.
     If a result is found, it is returned as a dictionary.
 
     Args:
@@ -149,9 +298,11 @@ async def fetching_account_tenant_id_by_email(db_pool: aiomysql.pool.Pool, email
     Returns:
         Dict[str, str]: A dictionary containing the account tenant ID, or None if no result is found.
     """
-    query = GET_ACCOUNT_TENANT_ID_BY_EMAIL_AND_FE_PROD_ID.format(f"'{email}'", f"'{os.getenv('PROD_VENDOR_ID')}'")
-
-    account_tenant_response = await fetch_one_query(db_pool=db_pool, query=query)
+    account_tenant_response = await fetch_one_query(
+        db_pool=db_pool,
+        query=GET_ACCOUNT_TENANT_ID_BY_EMAIL_AND_FE_PROD_ID,
+        args=(email, os.getenv('PROD_VENDOR_ID'))
+    )
     
     if account_tenant_response:
         return account_tenant_response
@@ -162,7 +313,7 @@ async def fetching_account_id_by_account_tenant_id(db_pool: aiomysql.pool.Pool,
     """
     Fetch the account ID by account tenant ID from the database.
 
-    This function constructs and executes a query to fetch the account ID associated with the given account tenant ID.
+    This function executes a parameterized query to fetch the account ID associated with the given account tenant ID.
     If a result is found, it is returned as a dictionary.
 
     Args:
@@ -172,9 +323,7 @@ async def fetching_account_id_by_account_tenant_id(db_pool: aiomysql.pool.Pool,
     Returns:
         Dict[str, str]: A dictionary containing the account ID, or None if no result is found.
     """
-    query = GET_ACCOUNT_ID_BY_ACCOUNT_TENANT_ID.format(f"'{account_tenant_id}'")
-
-    account_tenant_response = await fetch_one_query(db_pool=db_pool, query=query)
+    account_tenant_response = await fetch_one_query(db_pool=db_pool, query=GET_ACCOUNT_ID_BY_ACCOUNT_TENANT_ID, args=(account_tenant_id,))
 
     if account_tenant_response:
         return account_tenant_response
@@ -185,7 +334,7 @@ async def fetching_vendor_id_by_account_id(db_pool: aiomysql.pool.Pool, account_
     """
     Fetch the vendor ID by account ID from the database.
 
-    This function constructs and executes a query to fetch the vendor ID associated with the given account ID.
+    This function executes a parameterized query to fetch the vendor ID associated with the given account ID.
     If a result is found, it is returned as a dictionary.
 
     Args:
@@ -195,9 +344,7 @@ async def fetching_vendor_id_by_account_id(db_pool: aiomysql.pool.Pool, account_
     Returns:
         Dict[str, str]: A dictionary containing the vendor ID, or None if no result is found.
     """
-    query = GET_VENDORS_IDS_BY_ACCOUNT_ID_QUERY.format(f"'{account_id}'")
-
-    account_response = await fetch_one_query(db_pool=db_pool, query=query)
+    account_response = await fetch_one_query(db_pool=db_pool, query=GET_VENDORS_IDS_BY_ACCOUNT_ID_QUERY, args=(account_id,))
 
     if account_response:
         return account_response
@@ -208,7 +355,7 @@ async def fetching_tenant_dict_from_db(db_pool: aiomysql.pool.Pool, client_id: s
     """
     Fetch the tenant dictionary from the database using the client ID.
 
-    This function constructs and executes queries to fetch the vendor, account, and tenant details associated
+    This function executes parameterized queries to fetch the vendor, account, and tenant details associated
     with the given client ID. If all details are found, they are combined into a single dictionary and returned.
 
     Args:
@@ -218,19 +365,56 @@ async def fetching_tenant_dict_from_db(db_pool: aiomysql.pool.Pool, client_id: s
     Returns:
         Dict[str, str]: A dictionary containing the tenant details, or an empty dictionary if no results are found.
     """
-    vendor_query_result = await fetch_one_query(db_pool=db_pool, query=GET_VENDOR_BY_ID_QUERY.format(f"'{client_id}'"))
+    vendor_query_result = await fetch_one_query(db_pool=db_pool, query=GET_VENDOR_BY_ID_QUERY, args=(client_id,))
 
     if not vendor_query_result:
         return {}
     
-    account_query_result = await fetch_one_query(db_pool=db_pool, query=GET_ACCOUNT_DETAILS_BY_ID.format(f"'{vendor_query_result.get('accountId')}'"))
+    account_query_result = await fetch_one_query(db_pool=db_pool, query=GET_ACCOUNT_DETAILS_BY_ID, args=(vendor_query_result.get('accountId'),))
         
     if not account_query_result:
         return {}           
 
-    tenant_query_result = await fetch_one_query(db_pool=db_pool, query=GET_TENANT_CONFIGURATIONS_QUERY.format(f"'{account_query_result.get('accountTenantId')}'"))
+    tenant_query_result = await fetch_one_query(db_pool=db_pool, query=GET_TENANT_CONFIGURATIONS_QUERY, args=(account_query_result.get('accountTenantId'),))
    
     if tenant_query_result:    
-        return { 'id': tenant_query_result.get('id'), 'tenant_id': tenant_query_result.get('tenantId')}
+        return { 'id': tenant_query_result.get('id'), 'tenant_id': tenant_query_result.get('tenantId'), 'account_id': vendor_query_result.get('accountId')}
     
     return {}
+
+async def fetching_tenant_dicts_from_db(db_pool: aiomysql.pool.Pool, client_ids: List[str]) -> Dict[str,Dict[str,str]]:
+    """
+    Fetch the tenant dictionaries of several client IDs with one query per step.
+
+    This is the batched counterpart of `fetching_tenant_dict_from_db`: the vendors, their accounts and the tenant
+    configurations of the accounts are each fetched with a single `WHERE ... IN (...)` query.
+
+    Args:
+        db_pool (aiomysql.pool.Pool): The connection pool.
+        client_ids (List[str]): The client IDs to search for.
+
+    Returns:
+        Dict[str, Dict[str, str]]: The tenant details of every client ID that was found, keyed by client ID.
+
+    Raises:
+        QueryError: If a query fails, so the client IDs are not reported as having no tenant configuration.
+    """
+    vendor_rows = await fetch_all_in_chunks(db_pool=db_pool, query=GET_ACCOUNT_IDS_BY_VENDOR_IDS, values=client_ids, raise_on_error=True)
+    account_rows = await fetch_all_in_chunks(db_pool=db_pool, query=GET_ACCOUNTS_DETAILS_BY_IDS, values=[vendor.get('accountId') for vendor in vendor_rows], raise_on_error=True)
+    tenant_rows = await fetch_all_in_chunks(db_pool=db_pool, query=GET_TENANT_CONFIGURATIONS_BY_TENANT_IDS, values=[account.get('accountTenantId') for account in account_rows], raise_on_error=True)
+
+    account_tenant_ids = {account.get('id'): account.get('accountTenantId') for account in account_rows}
+    tenant_configurations = {}
+
+    for tenant in tenant_rows:
+        tenant_configurations.setdefault(tenant.get('tenantId'), tenant)
+
+    tenant_dicts = {}
+
+    for vendor in vendor_rows:
+        tenant_query_result = tenant_configurations.get(account_tenant_ids.get(vendor.get('accountId')))
+
+        if tenant_query_result:
+            tenant_dicts[vendor.get('id')] = {'id': tenant_query_result.get('id'), 'tenant_id': tenant_query_result.get('tenantId'), 'account_id': vendor.get('accountId')}
+
+    return tenant_dicts
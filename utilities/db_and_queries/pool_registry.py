@@ -0,0 +1,145 @@
+import asyncio
+import os
+from typing import Dict, Iterable, Optional, Tuple
+
+import aiomysql
+from dotenv import load_dotenv
+
+from consts import DB_POOL_MAX_SIZE, DB_POOL_MIN_SIZE, DB_POOL_RECYCLE, GENERAL, IDENTITY, REGIONS
+from utilities.event_loop import register_shutdown_hook
+
+load_dotenv('.env')
+
+_pools: Dict[Tuple[str, str], aiomysql.pool.Pool] = {}
+_pool_locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+
+
+async def connect_to_db(user_name: str, host: str, passwd: str, minsize: int = DB_POOL_MIN_SIZE, maxsize: int = DB_POOL_MAX_SIZE) -> aiomysql.pool.Pool:
+    """
+    Establish a connection to the database and return a connection pool.
+
+    This function retrieves the database connection credentials from the environment variables
+    and creates a connection pool using aiomysql.
+
+    Args:
+        user_name (str): The environment variable key for the database username.
+        host (str): The environment variable key for the database host.
+        passwd (str): The environment variable key for the database password.
+        minsize (int, optional): Minimum number of connections kept open. Defaults to DB_POOL_MIN_SIZE.
+        maxsize (int, optional): Maximum number of connections in the pool. Defaults to DB_POOL_MAX_SIZE.
+
+    Returns:
+        aiomysql.pool.Pool: A connection pool for interacting with the database.
+    """
+    user_name = os.getenv(user_name)
+    host = os.getenv(host)
+    passwd = os.getenv(passwd)
+
+    db_pool = await aiomysql.create_pool(
+        user=user_name,
+        host=host,
+        password=passwd,
+        minsize=minsize,
+        maxsize=maxsize,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+    return db_pool
+
+async def get_db_pool(db_type: str = GENERAL, region: str = 'EU') -> aiomysql.pool.Pool:
+    """
+    Returns the long-lived connection pool for a (db_type, region) pair, creating it on first use.
+
+    Pools are shared by every request in the process and are only closed by `close_all_pools`,
+    so callers must not close the pool they receive.
+
+    Args:
+        db_type (str, optional): The type of database, GENERAL or IDENTITY. Defaults to GENERAL.
+        region (str, optional): The region of the database. Defaults to 'EU'.
+
+    Returns:
+        aiomysql.pool.Pool: The shared connection pool.
+    """
+    key = (db_type, region)
+    db_pool = _pools.get(key)
+
+    if db_pool is not None:
+        return db_pool
+
+    lock = _pool_locks.setdefault(key, asyncio.Lock())
+
+    async with lock:
+        db_pool = _pools.get(key)
+
+        if db_pool is None:
+            db_pool = await connect_to_db(
+                user_name='USER_NAME',
+                host=f'HOST_{db_type}_{region}',
+                passwd=f'PASSWD_{db_type}_{region}'
+            )
+            _pools[key] = db_pool
+
+    return db_pool
+
+def has_db_pool(db_type: str = GENERAL, region: str = 'EU') -> bool:
+    """
+    Tells whether the pool of a database type and region has already been created.
+
+    Args:
+        db_type (str, optional): The database type. Defaults to GENERAL.
+        region (str, optional): The region. Defaults to 'EU'.
+
+    Returns:
+        bool: True if the pool exists.
+    """
+    return (db_type, region) in _pools
+
+def shares_host(region: str, db_types: Iterable[str] = (GENERAL, IDENTITY)) -> bool:
+    """
+    Tells whether the databases of several types are served by the same host in a region, so one query can join their schemas.
+
+    Args:
+        region (str): The region.
+        db_types (Iterable[str], optional): The database types. Defaults to GENERAL and IDENTITY.
+
+    Returns:
+        bool: True if every database type is configured with the same host.
+    """
+    hosts = {os.getenv(f'HOST_{db_type}_{region}') for db_type in db_types}
+
+    return len(hosts) == 1 and None not in hosts
+
+async def init_pools(db_types: Iterable[str] = (GENERAL, IDENTITY), regions: Optional[Iterable[str]] = None) -> None:
+    """
+    Eagerly creates the pools for the given database types and regions.
+
+    Args:
+        db_types (Iterable[str], optional): The database types to connect to. Defaults to GENERAL and IDENTITY.
+        regions (Optional[Iterable[str]], optional): The regions to connect to. Defaults to REGIONS.
+    """
+    regions = REGIONS if regions is None else regions
+
+    results = await asyncio.gather(
+        *[get_db_pool(db_type=db_type, region=region) for db_type in db_types for region in regions],
+        return_exceptions=True
+    )
+
+    for result in results:
+        if isinstance(result, Exception):
+            print(f"Pool warm up Error: {result}")
+
+async def close_all_pools() -> None:
+    """
+    Closes every pool in the registry and waits for their connections to be released.
+    """
+    pools = list(_pools.values())
+    _pools.clear()
+    _pool_locks.clear()
+
+    for db_pool in pools:
+        db_pool.close()
+
+    for db_pool in pools:
+        await db_pool.wait_closed()
+
+
+register_shutdown_hook(close_all_pools)
@@ -0,0 +1,151 @@
+import asyncio
+import atexit
+import concurrent.futures
+import contextvars
+import functools
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, Coroutine, Iterator, List, Optional
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_thread: Optional[threading.Thread] = None
+_loop_lock = threading.Lock()
+_shutdown_hooks: List[Callable[[], Awaitable[None]]] = []
+
+
+def get_background_loop() -> asyncio.AbstractEventLoop:
+    """
+    Returns the process-wide event loop, starting it in a daemon thread on first use.
+
+    Flask runs every async view in a brand new event loop, which makes it impossible to keep
+    loop-bound resources (DB pools, HTTP sessions) alive between requests. All async views are
+    executed on this single long-lived loop instead.
+
+    Returns:
+        asyncio.AbstractEventLoop: The running background event loop.
+    """
+    global _loop, _loop_thread
+
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            _loop_thread = threading.Thread(target=_loop.run_forever, name='background-event-loop', daemon=True)
+            _loop_thread.start()
+            atexit.register(shutdown_background_loop)
+
+    return _loop
+
+def run_coroutine(coro: Coroutine[Any, Any, Any]) -> Any:
+    """
+    Runs a coroutine on the background loop and blocks the calling thread until it is done.
+
+    The caller's context variables (e.g. Flask's request context) are copied into the task,
+    so `request` can still be used inside the coroutine.
+
+    Args:
+        coro (Coroutine): The coroutine to run.
+
+    Returns:
+        Any: The coroutine's result. Exceptions raised by the coroutine are re-raised.
+    """
+    loop = get_background_loop()
+    context = contextvars.copy_context()
+    future = concurrent.futures.Future()
+
+    def _copy_result(task: asyncio.Task) -> None:
+        if task.cancelled():
+            future.cancel()
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+
+    def _start() -> None:
+        if not future.set_running_or_notify_cancel():
+            coro.close()
+            return
+
+        task = loop.create_task(coro)
+        task.add_done_callback(_copy_result)
+
+    loop.call_soon_threadsafe(_start, context=context)
+
+    return future.result()
+
+def async_to_sync(func: Callable[..., Coroutine[Any, Any, Any]]) -> Callable[..., Any]:
+    """
+    Wraps a coroutine function so it can be called synchronously on the background loop.
+
+    Args:
+        func (Callable[..., Coroutine]): The coroutine function to wrap.
+
+    Returns:
+        Callable[..., Any]: A sync function returning the coroutine's result.
+    """
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return run_coroutine(func(*args, **kwargs))
+
+    return wrapper
+
+def iterate_async(iterator: AsyncIterator[Any]) -> Iterator[Any]:
+    """
+    Turns an async iterator into a sync generator whose items are produced on the background loop.
+
+    Each item is awaited with `run_coroutine`, so the generator can be handed to the WSGI server (e.g. as the body
+    of a streamed response) and consumed from its thread. The async iterator is closed on the background loop when
+    the generator is closed early, e.g. because the client disconnected.
+
+    Args:
+        iterator (AsyncIterator[Any]): The async iterator, typically an async generator.
+
+    Returns:
+        Iterator[Any]: A sync generator of the same items.
+    """
+    try:
+        while True:
+            try:
+                yield run_coroutine(iterator.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        aclose = getattr(iterator, 'aclose', None)
+
+        if aclose is not None:
+            run_coroutine(aclose())
+
+def register_shutdown_hook(hook: Callable[[], Awaitable[None]]) -> None:
+    """
+    Registers a coroutine function to be awaited on the background loop when the process exits.
+
+    Args:
+        hook (Callable[[], Awaitable[None]]): The coroutine function to call on shutdown.
+    """
+    _shutdown_hooks.append(hook)
+
+def shutdown_background_loop() -> None:
+    """
+    Runs the registered shutdown hooks and stops the background loop.
+    """
+    global _loop, _loop_thread
+
+    with _loop_lock:
+        loop, thread = _loop, _loop_thread
+        _loop, _loop_thread = None, None
+
+    if loop is None:
+        return
+
+    async def _run_hooks() -> None:
+        for hook in reversed(_shutdown_hooks):
+            try:
+                await hook()
+            except Exception as e:
+                print(f"Shutdown hook error: {e}")
+
+    try:
+        asyncio.run_coroutine_threadsafe(_run_hooks(), loop).result(timeout=10)
+    except Exception as e:
+        print(f"Shutdown Error: {e}")
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
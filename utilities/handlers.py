@@ -1,41 +1,60 @@
+import asyncio
+import base64
+import binascii
+import json
+import time
 import aiomysql
 from enum import Enum
 
 from flask import jsonify
 from consts import *
 from .utils import *
-from typing import Dict, List, Optional, Tuple
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
 from dotenv import load_dotenv
 
-from models.models import Account, SAML_groups, SSO_configs, Tenant, Vendor
-from utilities.db_and_queries.connections_and_queries import check_in_all_dbs, connect_to_db, fetch_all_query, fetch_one_query
+from models.models import FULL_TREE, Account, ResolutionContext, TreeOptions, SAML_groups, SSO_configs, Tenant, Vendor
+from utilities.account_tree import load_tenants_by_vendor_ids, load_tenants_page, load_vendors_by_account_id, saml_group_from_row, sso_config_from_row, tenant_from_row, vendor_from_row
+from utilities.db_and_queries.connections_and_queries import QueryError, fetch_all_in_chunks, fetch_all_query, fetch_one_query
+from utilities.db_and_queries.pool_registry import get_db_pool, has_db_pool, init_pools, shares_host
+from utilities.account_cache import ALIAS_EMAIL, ALIAS_TENANT, ALIAS_VENDOR, alias_account, cache_account, get_account_id_by_alias, get_cached_account, get_cached_account_by_alias, invalidate_account
+from utilities.serializers import encode_head, encode_value
+from utilities.single_flight import SingleFlight
+from utilities.region_locator import LOCATOR_ACCOUNT, LOCATOR_EMAIL, LOCATOR_TENANT, LOCATOR_VENDOR, get_known_region, locate_in_all_dbs, remember_region
 from utilities.zendesk_api.zendesk_requests import get_auth_header_from_zendesk_api, get_ticket_emails_from_zd_dict, get_users_from_zd_ticket
 
-from .utils import object_to_dict
-
 class QueryEnum(Enum):
     tenant = GET_ACCOUNT_BY_ID_QUERY
     vendor = GET_VENDOR_BY_ID_QUERY
 
+# concurrent identical lookups (e.g. several engineers opening the same account) share one query cascade
+lookup_flights = SingleFlight(name='lookups')
+
+
+def _flight_region(region: Optional[str]) -> str:
+    return (region or '').upper()
+
 
-async def get_all_account_data_by_zendesk_ticket_number(ticket_number: str) -> Optional[Dict]:
+async def get_all_account_data_by_zendesk_ticket_number(ticket_number: str, use_cache: bool = True, all_accounts: bool = False, options: TreeOptions = FULL_TREE) -> Optional[Dict]:
     """
     Retrieves all account data associated with a given Zendesk ticket number.
     
     This function first obtains an authentication header from the Zendesk API using the `get_auth_header_from_zendesk_api` function.
     It then retrieves the users associated with the given ticket number using the `get_users_from_zd_ticket` function.
     From the retrieved user data, it extracts the email addresses using the `get_ticket_emails_from_zd_dict` function.
-    For each customer email address, it attempts to fetch the associated account data using the `get_all_account_data_by_user_email` function.
-    If an account is found, it returns the account data. Otherwise, it returns an empty dictionary.
+    The customer email addresses are resolved concurrently with `get_all_account_data_by_user_email`. The account of the
+    first email, in ticket order, that resolves to one is returned and the remaining lookups are cancelled.
 
     Args:
         ticket_number (str): The Zendesk ticket number to search for.
+        use_cache (bool, optional): Whether a cached account tree may be returned. Defaults to True.
+        all_accounts (bool, optional): Whether to return every distinct account found on the ticket instead of the first one. Defaults to False.
+        options (TreeOptions, optional): The subtrees of the account trees to load. Defaults to FULL_TREE.
 
     Returns:
-        Optional[Dict]: A dictionary containing the account data, or an empty dictionary if no account is found.
+        Optional[Dict]: A dictionary containing the account data (or the `accounts` list), or an error dictionary if no account is found.
     """
     auth_header = await get_auth_header_from_zendesk_api(email='ZENDESK_EMAIL_TOKEN', api_token='ZENDESK_API_TOKEN')
-    res_dict = await get_users_from_zd_ticket(auth_header=auth_header, ticket_number=ticket_number)
+    res_dict = await get_users_from_zd_ticket(auth_header=auth_header, ticket_number=ticket_number, use_cache=use_cache)
 
     if res_dict.get('error'):
         return {'error': res_dict.get('error')}
@@ -43,15 +62,63 @@ async def get_all_account_data_by_zendesk_ticket_number(ticket_number: str) -> O
     emails = await get_ticket_emails_from_zd_dict(res_dict=res_dict)
     
     if emails['Customer']:
-        for email in emails['Customer']:
-            account = await get_all_account_data_by_user_email(user_email=email)
+        if all_accounts:
+            accounts = await _resolve_all_ticket_emails(emails=emails['Customer'], use_cache=use_cache, options=options)
+
+            if accounts:
+                return {'accounts': accounts}
+
+        else:
+            account = await _resolve_first_ticket_email(emails=emails['Customer'], use_cache=use_cache, options=options)
 
             if account:
                 return account
     
     return {'error': 'ticket was not found'}   
 
-async def get_all_account_data_by_user_email(user_email: str, region: Optional[str] = None) -> Dict[str,str]:    
+def _start_ticket_email_lookups(emails: List[str], use_cache: bool, options: TreeOptions) -> List[asyncio.Task]:
+    semaphore = asyncio.Semaphore(TICKET_EMAIL_CONCURRENCY)
+
+    async def _resolve(email: str) -> Optional[Dict]:
+        async with semaphore:
+            try:
+                account = await get_all_account_data_by_user_email(user_email=email, use_cache=use_cache, options=options)
+            except Exception as e:
+                print(f"Error resolving {email}: {e}")
+                return None
+
+        if not account or isinstance(account, dict) and account.get('error'):
+            return None
+
+        return account
+
+    return [asyncio.ensure_future(_resolve(email)) for email in dict.fromkeys(emails)]
+
+async def _resolve_first_ticket_email(emails: List[str], use_cache: bool, options: TreeOptions) -> Optional[Dict]:
+    tasks = _start_ticket_email_lookups(emails=emails, use_cache=use_cache, options=options)
+
+    try:
+        for task in tasks:
+            account = await task
+
+            if account:
+                return account
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    return None
+
+async def _resolve_all_ticket_emails(emails: List[str], use_cache: bool, options: TreeOptions) -> List[Dict]:
+    accounts = {}
+
+    for account in await asyncio.gather(*_start_ticket_email_lookups(emails=emails, use_cache=use_cache, options=options)):
+        if account:
+            accounts.setdefault(account.id if isinstance(account, Account) else account.get('id'), account)
+
+    return list(accounts.values())
+
+async def get_all_account_data_by_user_email(user_email: str, region: Optional[str] = None, use_cache: bool = True, options: TreeOptions = FULL_TREE) -> Dict[str,str]:    
     """
     Retrieves all account data associated with a given user email address.
     
@@ -59,50 +126,142 @@ async def get_all_account_data_by_user_email(user_email: str, region: Optional[s
     If the account tenant ID is found, it then fetches the account ID using the `_fetch_tenant_id_by_account_tenant_id_from_db` function.
     Next, it fetches the vendor ID using the `_fetch_vendor_id_by_account_id_from_db` function.
     Finally, it calls the `get_all_account_data_by_vendor_id` function to retrieve the complete account data.
+    When EMAIL_JOINED_RESOLUTION is on, `_resolve_email_joined` first tries to resolve the email with joined queries,
+    and only the steps it could not complete are run one by one.
+    An email already resolved to a cached account is answered from the account tree cache.
 
     Args:
         user_email (str): The user email address to search for.
         region (Optional[str], optional): The region to search in. Defaults to None.
+        use_cache (bool, optional): Whether a cached account tree may be returned. Defaults to True.
+        options (TreeOptions, optional): The subtrees of the account tree to load. Defaults to FULL_TREE.
 
     Returns:
         Dict[str, str]: A dictionary containing the account data, or None if no account is found.
     """
-    # get accountTenantId by email
-    user_dict = await _fetch_account_tenant_id_by_customer_email_from_db(email=user_email, region=region)
+    if use_cache:
+        cached_account = get_cached_account_by_alias(kind=ALIAS_EMAIL, key=user_email, options=options, region=region)
+
+        if cached_account:
+            return cached_account
+
+    context = ResolutionContext(region=region)
 
-    if not user_dict:
+    if EMAIL_JOINED_RESOLUTION:
+        await _resolve_email_joined(email=user_email, context=context)
+    else:
+        # get accountTenantId by email
+        context.user = await _fetch_account_tenant_id_by_customer_email_from_db(email=user_email, region=context.region)
+
+    if not context.user:
         return {'error': 'email is not valid or cannot be found'}
 
+    # the IDENTITY and GENERAL databases of a region live together, so every later step is pinned to this region
+    context.region = context.region or context.user.get('region')
+
     # get account Id by accountTenantId:
-    account_tenant_id = user_dict.get('tenantId')
-    account_tenant_response = await _fetch_tenant_id_by_account_tenant_id_from_db(account_tenant_id=account_tenant_id, region=region)
-    if not account_tenant_response:
+    if not context.account:
+        account_tenant_id = context.user.get('tenantId')
+        context.account = await _fetch_tenant_id_by_account_tenant_id_from_db(account_tenant_id=account_tenant_id, region=context.region)
+    if not context.account:
         return None   
     
-    account_id = account_tenant_response.get('id')
+    account_id = context.account.get('id')
+    alias_account(kind=ALIAS_EMAIL, key=user_email, account_id=account_id)
+
+    if use_cache:
+        cached_account = get_cached_account(account_id=account_id, options=options, region=context.region)
 
-    account_response = await _fetch_vendor_id_by_account_id_from_db(account_id=account_id, region=region)
+        if cached_account:
+            return cached_account
 
-    vendor_id = account_response.get('id')
-    account = await get_all_account_data_by_vendor_id(vendor_id=vendor_id, region=region)
+    if not context.vendor:
+        context.vendor = await _fetch_vendor_id_by_account_id_from_db(account_id=account_id, region=context.region)
+
+    if not context.vendor:
+        return {'error': 'vendor was not found'}
+
+    vendor_id = context.vendor.get('id')
+    account = await get_all_account_data_by_vendor_id(vendor_id=vendor_id, region=context.region, use_cache=use_cache, context=context, options=options)
     
     return account 
 
-async def get_all_account_data_by_tenant_id(tenant_id: str,  region: Optional[str] = None) -> Dict[str,str]: 
+async def _resolve_email_joined(email: str, context: ResolutionContext) -> None:
+    """
+    Resolves an email to its user, account and vendor rows with as few round trips as possible.
+
+    When the region is known (given, or remembered by the region locator) and its IDENTITY and GENERAL schemas are
+    served by the same host, the whole chain is a single joined query. Otherwise the user is looked up on the
+    IDENTITY database while any missing GENERAL pool is created, and the account and its vendor are then fetched
+    with one joined GENERAL query. Whatever could not be resolved is left unset in the context for the step-by-step path.
+
+    Args:
+        email (str): The user email address to search for.
+        context (ResolutionContext): The resolution context to fill.
+    """
+    region = context.region or get_known_region(kind=LOCATOR_EMAIL, key=email)
+
+    if region and shares_host(region=region):
+        db_pool = await get_db_pool(db_type=GENERAL, region=region)
+        row = await fetch_one_query(db_pool=db_pool, query=GET_USER_ACCOUNT_AND_VENDOR_BY_EMAIL_AND_FE_PROD_ID, args=(email, os.getenv('PROD_VENDOR_ID')))
+
+        if row:
+            context.region = region
+            context.user = {'id': row.get('userId'), 'tenantId': row.get('tenantId'), 'region': region}
+            _set_account_and_vendor(context=context, row=row)
+            remember_region(kind=LOCATOR_EMAIL, key=email, region=region)
+            return
+
+    # GENERAL pools that do not exist yet are created while the user is looked up on IDENTITY
+    missing_regions = [pool_region for pool_region in ([context.region] if context.region else REGIONS) if not has_db_pool(db_type=GENERAL, region=pool_region)]
+    warm_up = asyncio.ensure_future(init_pools(db_types=(GENERAL,), regions=missing_regions)) if missing_regions else None
+
+    try:
+        context.user = await _fetch_account_tenant_id_by_customer_email_from_db(email=email, region=context.region)
+    finally:
+        if warm_up is not None:
+            await warm_up
+
+    if not context.user:
+        return
+
+    context.region = context.region or context.user.get('region')
+
+    if context.region:
+        db_pool = await get_db_pool(db_type=GENERAL, region=context.region)
+        row = await fetch_one_query(db_pool=db_pool, query=GET_ACCOUNT_AND_VENDOR_BY_ACCOUNT_TENANT_ID, args=(context.user.get('tenantId'),))
+
+        if row:
+            _set_account_and_vendor(context=context, row=row)
+
+def _set_account_and_vendor(context: ResolutionContext, row: Dict[str,Any]) -> None:
+    context.account = {'id': row.get('id'), 'name': row.get('name'), 'accountTenantId': row.get('accountTenantId')}
+    context.vendor = {'id': row.get('vendorId'), 'accountId': row.get('id')}
+
+async def get_all_account_data_by_tenant_id(tenant_id: str,  region: Optional[str] = None, use_cache: bool = True, options: TreeOptions = FULL_TREE) -> Dict[str,str]: 
     """
     Retrieves all account data associated with a given tenant ID.
     
     This function first fetches the account dictionary associated with the given tenant ID using the `_fetch_account_by_tenant_id_from_db` function.
     If the account is found, it extracts the vendor ID and calls the `get_all_account_data_by_vendor_id` function to retrieve the complete account data.
     If the region is not provided, it attempts to retrieve the region from the account dictionary.
+    A tenant of a cached account is answered from the account tree cache.
 
     Args:
         tenant_id (str): The tenant ID to search for.
         region (Optional[str], optional): The region to search in. Defaults to None.
+        use_cache (bool, optional): Whether a cached account tree may be returned. Defaults to True.
+        options (TreeOptions, optional): The subtrees of the account tree to load. Defaults to FULL_TREE.
 
     Returns:
         Dict[str, str]: A dictionary containing the account data, or an error message if no account is found.
     """
+    if use_cache:
+        cached_account = get_cached_account_by_alias(kind=ALIAS_TENANT, key=tenant_id, options=options, region=region)
+
+        if cached_account:
+            return cached_account
+
     account_dict = await _fetch_account_by_tenant_id_from_db(tenant_id=tenant_id, region=region)
         
     if not account_dict:
@@ -113,22 +272,31 @@ async def get_all_account_data_by_tenant_id(tenant_id: str,  region: Optional[st
     if account_dict.get('region') and not region:
         region = account_dict.get('region')
         
-    account = await get_all_account_data_by_vendor_id(vendor_id=vendor_id, region=region)
+    account = await get_all_account_data_by_vendor_id(vendor_id=vendor_id, region=region, use_cache=use_cache, options=options)
     
     return account 
 
-async def get_all_account_data_by_vendor_id(vendor_id: str,  region: Optional[str] = None) -> Dict[str,str]:
+async def get_all_account_data_by_vendor_id(vendor_id: str,  region: Optional[str] = None, use_cache: bool = True, context: Optional[ResolutionContext] = None, options: TreeOptions = FULL_TREE) -> Dict[str,str]:
     """
     Retrieves all account data associated with a given vendor ID.
     
     This function first fetches the account dictionary, account main data, and a database connection pool associated with the given vendor ID using the `_fetch_account_dict_by_vendor_id_from_db` function.
     If the account is found, it creates an `Account` object and populates it with the account ID, name, and region.
-    It then fetches a list of `Vendor` objects associated with the account using the `_fetch_all_vendors_by_account_id_from_db` function and assigns it to the `vendors` attribute of the `Account` object.
-    Finally, it converts the `Account` object to a dictionary and returns it.
+    It then fetches a list of `Vendor` objects associated with the account using the batched `load_vendors_by_account_id` loader
+    (or the per-entity `_fetch_all_vendors_by_account_id_from_db` function when `ACCOUNT_TREE_BATCHED` is off) and assigns it to the `vendors` attribute of the `Account` object.
+    Finally, it returns the `Account` object, which the endpoints serialize with its compiled encoder (see `utilities.serializers`).
+    The result is kept in the account tree cache, keyed by account ID with every vendor and tenant ID of the account
+    pointing to it, so later lookups of the same account skip the databases until the entry expires or is invalidated.
+    Concurrent lookups of the same vendor and region share one in-flight build.
+    The options leave out subtrees (tenants, SSO configurations, SAML groups) that are then not queried at all.
+    Partial trees are cached apart from the full one, which also answers partial lookups.
 
     Args:
         vendor_id (str): The vendor ID to search for.
         region (Optional[str], optional): The region to search in. Defaults to None.
+        use_cache (bool, optional): Whether a cached account tree may be returned. The fresh tree is cached either way. Defaults to True.
+        context (Optional[ResolutionContext], optional): The vendor and account rows already fetched by the caller, which are not fetched again. Defaults to None.
+        options (TreeOptions, optional): The subtrees of the account tree to load. Defaults to FULL_TREE.
 
     Returns:
         Dict[str, str]: A dictionary containing the account data, or an error message if no account is found.
@@ -137,28 +305,407 @@ async def get_all_account_data_by_vendor_id(vendor_id: str,  region: Optional[st
     prod_vendor_id = os.getenv("PROD_VENDOR_ID")
     
     if vendor_id == prod_vendor_id:
-        return jsonify({'error': 'Nice try! are trying to f@#k my app?!\nDONT ENTER FRONTEGG\'S PROD ID'})
+        return {'error': 'Nice try! are trying to f@#k my app?!\nDONT ENTER FRONTEGG\'S PROD ID'}
+
+    if use_cache:
+        cached_account = get_cached_account_by_alias(kind=ALIAS_VENDOR, key=vendor_id, options=options, region=region)
+
+        if cached_account:
+            return cached_account
     
-    account_dict, account_main_data, db_pool = await _fetch_account_dict_by_vendor_id_from_db(vendor_id=vendor_id, region=region)
+    return await lookup_flights.do(
+        key=('account_tree', vendor_id, _flight_region(region), options),
+        func=lambda: _load_account_data_by_vendor_id(vendor_id=vendor_id, region=region, context=context, options=options)
+    )
+
+async def _load_account_data_by_vendor_id(vendor_id: str, region: Optional[str] = None, context: Optional[ResolutionContext] = None, options: TreeOptions = FULL_TREE) -> Dict[str,str]:
+    account_dict, account_main_data, db_pool = await _fetch_account_dict_by_vendor_id_from_db(vendor_id=vendor_id, region=region, context=context)
     
     if account_dict.get('error'):
         return account_dict
     
+    return await _build_account_data(account_dict=account_dict, account_id=account_main_data.get('account_id'), region=account_main_data.get('region'), db_pool=db_pool, options=options)
+
+async def _build_account_data(account_dict: Dict[str,str], account_id: str, region: str, db_pool: aiomysql.pool.Pool, options: TreeOptions = FULL_TREE) -> Union[Account, Dict[str,str]]:
+    """
+    Assembles the account tree of an account row and stores it in the account tree cache.
+
+    Args:
+        account_dict (Dict[str, str]): The `frontegg_vendors.accounts` row of the account.
+        account_id (str): The account ID.
+        region (str): The region of the account.
+        db_pool (aiomysql.pool.Pool): The GENERAL database connection pool of the region.
+        options (TreeOptions, optional): The subtrees to load. Defaults to FULL_TREE.
+
+    Returns:
+        Union[Account, Dict[str, str]]: The account, with its vendors and their tenants, or an error dictionary if
+            a query failed while loading the tree, in which case nothing is cached.
+    """
     #  3. generate account model and assign id and name
     account = Account(
         id=account_dict.get('id'),
         name=account_dict.get('name'),
-        region=account_main_data.get('region'),
+        region=region,
     )
     
-    vendors_list = await _fetch_all_vendors_by_account_id_from_db(account_id=account_main_data.get('account_id'), db_pool=db_pool)
+    try:
+        # only the batched loaders can leave subtrees out
+        if ACCOUNT_TREE_BATCHED or options != FULL_TREE:
+            vendors_list = await load_vendors_by_account_id(account_id=account_id, db_pool=db_pool, options=options)
+        else:
+            vendors_list = await _fetch_all_vendors_by_account_id_from_db(account_id=account_id, db_pool=db_pool)
+    except Exception as e:
+        # a partially loaded tree is neither returned nor cached
+        print(f"Error loading the account tree of {account_id}: {e}")
+        return {'error': 'account tree could not be loaded'}
     
     account.number_of_environments = len(vendors_list)
     account.vendors = vendors_list
+
+    remember_region(kind=LOCATOR_ACCOUNT, key=account_id, region=account.region)
+
+    for vendor_obj in vendors_list:
+        remember_region(kind=LOCATOR_VENDOR, key=vendor_obj.id, region=account.region)
     
-    account_dict = object_to_dict(obj=account)
+    # the Account itself is cached and returned, the endpoints serialize it with its compiled encoder
+    cache_account(
+        account_id=account_id,
+        account_data=account,
+        vendor_ids=[vendor_obj.id for vendor_obj in vendors_list],
+        tenant_ids=[tenant_obj.id for vendor_obj in vendors_list for tenant_obj in vendor_obj.tenants or []],
+        options=options
+    )
     
-    return account_dict
+    return account
+
+async def stream_account_data_by_vendor_id(vendor_id: str, region: Optional[str] = None, use_cache: bool = True, options: TreeOptions = FULL_TREE) -> AsyncIterator[str]:
+    """
+    Streams the account data of a vendor ID as JSON text, one vendor at a time.
+
+    The account row and its vendor rows are fetched first and the account fields are emitted right away. The
+    tenants of each vendor (with their SSO configurations and SAML groups) are then loaded with the batched loaders
+    and the vendor is emitted as soon as they are assembled, so only one vendor is held in memory. The chunks add
+    up to the same JSON as the response of `get_all_account_data_by_vendor_id`.
+    A cached account tree is emitted as is. A streamed tree is not cached, since holding all of it is what
+    streaming avoids.
+    Errors before the account fields are emitted come out as a single error object. A query that fails after that
+    raises out of the generator instead: the status line is already sent, so the body is cut short and is not valid
+    JSON, rather than a tree with vendors or tenants silently missing.
+
+    Args:
+        vendor_id (str): The vendor ID to search for.
+        region (Optional[str], optional): The region to search in. Defaults to None.
+        use_cache (bool, optional): Whether a cached account tree may be returned. Defaults to True.
+        options (TreeOptions, optional): The subtrees to load and the fields to emit. Defaults to FULL_TREE.
+
+    Yields:
+        str: The chunks of the JSON text, ending with a newline.
+
+    Raises:
+        QueryError: If a query fails once the body has started.
+    """
+    load_dotenv()
+
+    if vendor_id == os.getenv("PROD_VENDOR_ID"):
+        yield encode_value({'error': 'Nice try! are trying to f@#k my app?!\nDONT ENTER FRONTEGG\'S PROD ID'}) + '\n'
+        return
+
+    if use_cache:
+        cached_account = get_cached_account_by_alias(kind=ALIAS_VENDOR, key=vendor_id, options=options, region=region)
+
+        if cached_account:
+            yield encode_value(cached_account, options.fieldsets) + '\n'
+            return
+
+    account_dict, account_main_data, db_pool = await _fetch_account_dict_by_vendor_id_from_db(vendor_id=vendor_id, region=region)
+
+    if account_dict.get('error'):
+        yield encode_value(account_dict) + '\n'
+        return
+
+    account_id = account_main_data.get('account_id')
+    vendor_rows = await fetch_all_query(db_pool=db_pool, query=GET_VENDORS_IDS_BY_ACCOUNT_ID_QUERY, args=(account_id,))
+
+    if vendor_rows is None:
+        yield encode_value({'error': 'account tree could not be loaded'}) + '\n'
+        return
+
+    account = Account(
+        id=account_dict.get('id'),
+        name=account_dict.get('name'),
+        region=account_main_data.get('region'),
+        number_of_environments=len(vendor_rows),
+    )
+    remember_region(kind=LOCATOR_ACCOUNT, key=account_id, region=account.region)
+
+    if not options.tenants:
+        # without tenants the vendor rows are the whole tree, there is nothing to stream vendor by vendor
+        account.vendors = [vendor_from_row(vendor_row) for vendor_row in vendor_rows]
+        yield encode_value(account, options.fieldsets) + '\n'
+        return
+
+    yield encode_head(obj=account, open_field='vendors', fieldsets=options.fieldsets) + '['
+
+    for index, vendor_row in enumerate(vendor_rows):
+        vendor_obj = vendor_from_row(vendor_row)
+        tenants_by_vendor_id = await load_tenants_by_vendor_ids(vendor_ids=[vendor_obj.id], db_pool=db_pool, options=options)
+        vendor_obj.tenants = tenants_by_vendor_id.get(vendor_obj.id, [])
+        remember_region(kind=LOCATOR_VENDOR, key=vendor_obj.id, region=account.region)
+
+        yield (',' if index else '') + encode_value(vendor_obj, options.fieldsets)
+
+    yield ']}\n'
+
+async def get_tenants_page_by_vendor_id(vendor_id: str, region: Optional[str] = None, page_size: int = TENANTS_PAGE_SIZE, cursor: Optional[str] = None, options: TreeOptions = FULL_TREE) -> Dict[str,Any]:
+    """
+    Retrieves one page of the tenants of an environment, with their SSO configurations and SAML groups.
+
+    Tenants are ordered by tenant ID and paged by keyset: the cursor holds the last tenant ID of the previous page
+    and the query starts right after it, so fetching a deep page costs the same as fetching the first one.
+
+    Args:
+        vendor_id (str): The vendor ID of the environment.
+        region (Optional[str], optional): The region to search in. Defaults to None.
+        page_size (int, optional): The number of tenants per page. Defaults to TENANTS_PAGE_SIZE.
+        cursor (Optional[str], optional): The `next_cursor` of the previous page. Defaults to None (the first page).
+        options (TreeOptions, optional): The subtrees of the tenants to load. Defaults to FULL_TREE.
+
+    Returns:
+        Dict[str, Any]: The `tenants` of the page, the `vendor_id` and the `next_cursor` (None on the last page),
+            or an error dictionary.
+    """
+    load_dotenv()
+
+    if vendor_id == os.getenv("PROD_VENDOR_ID"):
+        return {'error': 'Nice try! are trying to f@#k my app?!\nDONT ENTER FRONTEGG\'S PROD ID'}
+
+    after = _decode_tenants_cursor(vendor_id=vendor_id, cursor=cursor) if cursor else ''
+
+    if after is None:
+        return {'error': 'Invalid cursor'}
+
+    vendor_dict = await _fetch_vendor_by_id_from_db(vendor_id=vendor_id, region=region)
+
+    if not vendor_dict:
+        return {'error': 'vendor was not found'}
+
+    region = region or vendor_dict.get('region')
+    db_pool = await get_db_pool(db_type=GENERAL, region=region)
+
+    try:
+        tenants_list, next_after = await load_tenants_page(vendor_id=vendor_id, db_pool=db_pool, page_size=page_size, after=after, options=options)
+    except QueryError as e:
+        # an empty page would tell the client the listing is over
+        print(f"Error loading the tenants page of {vendor_id}: {e}")
+        return {'error': 'tenants page could not be loaded'}
+
+    return {
+        'vendor_id': vendor_id,
+        'tenants': tenants_list,
+        'next_cursor': _encode_tenants_cursor(vendor_id=vendor_id, after=next_after) if next_after else None,
+    }
+
+def _encode_tenants_cursor(vendor_id: str, after: str) -> str:
+    payload = json.dumps({'vendorId': vendor_id, 'after': after}, separators=(',', ':'))
+
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def _decode_tenants_cursor(vendor_id: str, cursor: str) -> Optional[str]:
+    # a cursor only continues the listing of the environment it was issued for
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        return None
+
+    if not isinstance(payload, dict) or payload.get('vendorId') != vendor_id or not isinstance(payload.get('after'), str):
+        return None
+
+    return payload.get('after')
+
+async def get_all_account_data_in_batch(vendor_ids: List[str], tenant_ids: List[str], emails: List[str], use_cache: bool = True, options: TreeOptions = FULL_TREE) -> Dict[str,Any]:
+    """
+    Retrieves the account data of many vendor IDs, tenant IDs and emails at once.
+
+    The inputs are resolved to distinct accounts with one `IN (...)` query per lookup step and region, the regions
+    being queried concurrently. Each account tree is then built once, at most BATCH_ACCOUNT_CONCURRENCY at a time,
+    no matter how many of the inputs belong to it. Accounts already in the account tree cache are not rebuilt.
+    Inputs that belong to the account of Frontegg's own production vendor are refused, like in the single lookups.
+    A region that cannot be searched only fails the inputs that were not found elsewhere.
+
+    Args:
+        vendor_ids (List[str]): The vendor IDs to look up.
+        tenant_ids (List[str]): The tenant IDs to look up.
+        emails (List[str]): The user emails to look up.
+        use_cache (bool, optional): Whether cached account trees may be returned. Defaults to True.
+        options (TreeOptions, optional): The subtrees of the account trees to load. Defaults to FULL_TREE.
+
+    Returns:
+        Dict[str, Any]: The account data of every account found, keyed by account ID (`accounts`), for each kind
+            of input a map from the input to its account ID, or None if it was not found (`vendor_ids`, `tenant_ids`, `emails`),
+            and for each kind the error of the inputs that were refused or could not be looked up (`errors`).
+    """
+    load_dotenv()
+    prod_vendor_id = os.getenv('PROD_VENDOR_ID')
+    prod_vendor_error = 'Nice try! are trying to f@#k my app?!\nDONT ENTER FRONTEGG\'S PROD ID'
+
+    inputs = {
+        ALIAS_VENDOR: list(dict.fromkeys(vendor_ids)),
+        ALIAS_TENANT: list(dict.fromkeys(tenant_ids)),
+        ALIAS_EMAIL: list(dict.fromkeys(emails)),
+    }
+    account_ids = {kind: {} for kind in inputs}
+    errors = {kind: {} for kind in inputs}
+    accounts = {}
+
+    for key in inputs[ALIAS_VENDOR]:
+        if prod_vendor_id and key == prod_vendor_id:
+            errors[ALIAS_VENDOR][key] = prod_vendor_error
+
+    if use_cache:
+        for kind, keys in inputs.items():
+            for key in keys:
+                account_id = get_account_id_by_alias(kind=kind, key=key)
+                cached_account = get_cached_account(account_id=account_id, options=options)
+
+                if cached_account and key not in errors[kind]:
+                    if any(vendor_obj.id == prod_vendor_id for vendor_obj in cached_account.vendors or []):
+                        errors[kind][key] = prod_vendor_error
+                    else:
+                        account_ids[kind][key] = account_id
+                        accounts[account_id] = cached_account
+
+    pending = {kind: [key for key in keys if key not in account_ids[kind] and key not in errors[kind]] for kind, keys in inputs.items()}
+    account_rows = {}
+    failed_regions = []
+
+    if any(pending.values()):
+        results = await asyncio.gather(
+            *[_resolve_account_ids_in_region(region=region, pending=pending, known_account_ids=set(accounts)) for region in REGIONS],
+            return_exceptions=True
+        )
+
+        for region, result in zip(REGIONS, results):
+            if isinstance(result, Exception):
+                # the other regions still answer for the inputs they hold
+                print(f"Batch lookup Error in {region}: {result}")
+                failed_regions.append(region)
+                continue
+
+            region_account_ids, region_account_rows, region_refused = result
+
+            for kind, resolved in region_account_ids.items():
+                for key, account_id in resolved.items():
+                    account_ids[kind].setdefault(key, account_id)
+
+            for kind, keys in region_refused.items():
+                for key in keys:
+                    errors[kind][key] = prod_vendor_error
+
+            for account_id, account_row in region_account_rows.items():
+                account_rows.setdefault(account_id, (account_row, region))
+
+    if failed_regions:
+        for kind, keys in pending.items():
+            for key in keys:
+                if key not in account_ids[kind] and key not in errors[kind]:
+                    errors[kind][key] = f'lookup failed in {", ".join(failed_regions)}'
+
+    for key, account_id in account_ids[ALIAS_EMAIL].items():
+        alias_account(kind=ALIAS_EMAIL, key=key, account_id=account_id)
+
+    semaphore = asyncio.Semaphore(BATCH_ACCOUNT_CONCURRENCY)
+
+    async def _build(account_id: str, account_row: Dict[str,str], region: str) -> None:
+        async with semaphore:
+            db_pool = await get_db_pool(db_type=GENERAL, region=region)
+            accounts[account_id] = await _build_account_data(account_dict=account_row, account_id=account_id, region=region, db_pool=db_pool, options=options)
+
+    await asyncio.gather(*[_build(account_id, account_row, region) for account_id, (account_row, region) in account_rows.items()])
+
+    return {
+        'accounts': accounts,
+        'vendor_ids': {key: account_ids[ALIAS_VENDOR].get(key) for key in inputs[ALIAS_VENDOR]},
+        'tenant_ids': {key: account_ids[ALIAS_TENANT].get(key) for key in inputs[ALIAS_TENANT]},
+        'emails': {key: account_ids[ALIAS_EMAIL].get(key) for key in inputs[ALIAS_EMAIL]},
+        'errors': {
+            'vendor_ids': errors[ALIAS_VENDOR],
+            'tenant_ids': errors[ALIAS_TENANT],
+            'emails': errors[ALIAS_EMAIL],
+        },
+    }
+
+async def _resolve_account_ids_in_region(region: str, pending: Dict[str,List[str]], known_account_ids: set) -> Tuple[Dict[str,Dict[str,str]], Dict[str,Dict[str,str]], Dict[str,List[str]]]:
+    """
+    Resolves vendor IDs, tenant IDs and emails to account IDs in one region with batched queries.
+
+    Tenants are resolved to their vendors and emails to their account tenants first (concurrently), then all vendor
+    IDs to their accounts, and finally the rows of the accounts that are not already known are fetched.
+    Inputs that belong to the account of Frontegg's own production vendor are refused rather than resolved, whether
+    they are its vendors, their tenants or the emails of its users.
+
+    Args:
+        region (str): The region to search in.
+        pending (Dict[str, List[str]]): The inputs to resolve, keyed by ALIAS_* kind.
+        known_account_ids (set): Account IDs whose account data is already available.
+
+    Returns:
+        Tuple[Dict[str, Dict[str, str]], Dict[str, Dict[str, str]], Dict[str, List[str]]]: The account ID of every input
+            found in the region, keyed by kind, the account rows of the newly found accounts, keyed by account ID, and
+            the refused inputs, keyed by kind.
+
+    Raises:
+        QueryError: If a query fails, so the inputs are not reported as missing.
+    """
+    prod_vendor_id = os.getenv('PROD_VENDOR_ID')
+    general_pool = await get_db_pool(db_type=GENERAL, region=region)
+
+    async def _vendors_of_tenants() -> Dict[str,str]:
+        if not pending[ALIAS_TENANT]:
+            return {}
+
+        rows = await fetch_all_in_chunks(db_pool=general_pool, query=GET_VENDOR_IDS_BY_TENANT_IDS, values=pending[ALIAS_TENANT], raise_on_error=True)
+
+        return {row.get('accountId'): row.get('vendorId') for row in rows}
+
+    async def _accounts_of_emails() -> Dict[str,str]:
+        if not pending[ALIAS_EMAIL]:
+            return {}
+
+        identity_pool = await get_db_pool(db_type=IDENTITY, region=region)
+        user_rows = await fetch_all_in_chunks(db_pool=identity_pool, query=GET_ACCOUNT_TENANT_IDS_BY_EMAILS_AND_FE_PROD_ID, values=pending[ALIAS_EMAIL], args=(prod_vendor_id,), raise_on_error=True)
+        account_rows = await fetch_all_in_chunks(db_pool=general_pool, query=GET_ACCOUNT_IDS_BY_ACCOUNT_TENANT_IDS, values=[row.get('tenantId') for row in user_rows], raise_on_error=True)
+        account_id_by_account_tenant_id = {row.get('accountTenantId'): row.get('id') for row in account_rows}
+
+        return {row.get('email'): account_id_by_account_tenant_id.get(row.get('tenantId')) for row in user_rows if row.get('tenantId') in account_id_by_account_tenant_id}
+
+    vendor_by_tenant_id, account_by_email = await asyncio.gather(_vendors_of_tenants(), _accounts_of_emails())
+
+    # the production vendor is looked up with the others, to know which account it belongs to
+    vendor_rows = await fetch_all_in_chunks(
+        db_pool=general_pool,
+        query=GET_ACCOUNT_IDS_BY_VENDOR_IDS,
+        values=list(dict.fromkeys([vendor_id for vendor_id in pending[ALIAS_VENDOR] + list(vendor_by_tenant_id.values()) + [prod_vendor_id] if vendor_id])),
+        raise_on_error=True
+    )
+    account_by_vendor_id = {row.get('id'): row.get('accountId') for row in vendor_rows}
+    prod_account_id = account_by_vendor_id.get(prod_vendor_id) if prod_vendor_id else None
+
+    found = {
+        ALIAS_VENDOR: {key: account_by_vendor_id[key] for key in pending[ALIAS_VENDOR] if key in account_by_vendor_id},
+        ALIAS_TENANT: {key: account_by_vendor_id[vendor_id] for key, vendor_id in vendor_by_tenant_id.items() if vendor_id in account_by_vendor_id},
+        ALIAS_EMAIL: account_by_email,
+    }
+    resolved = {kind: {key: account_id for key, account_id in accounts_by_key.items() if not prod_account_id or account_id != prod_account_id} for kind, accounts_by_key in found.items()}
+    refused = {kind: [key for key in accounts_by_key if key not in resolved[kind]] for kind, accounts_by_key in found.items()}
+
+    for kind, locator_kind in ((ALIAS_VENDOR, LOCATOR_VENDOR), (ALIAS_TENANT, LOCATOR_TENANT), (ALIAS_EMAIL, LOCATOR_EMAIL)):
+        for key in resolved[kind]:
+            remember_region(kind=locator_kind, key=key, region=region)
+
+    new_account_ids = {account_id for accounts_by_key in resolved.values() for account_id in accounts_by_key.values()} - known_account_ids
+    account_rows = await fetch_all_in_chunks(db_pool=general_pool, query=GET_ACCOUNTS_DETAILS_BY_IDS, values=list(new_account_ids), raise_on_error=True)
+
+    return resolved, {row.get('id'): row for row in account_rows}, refused
 
 async def check_if_white_label(vendor_id: str, region: Optional[str] = None) -> int:
     """
@@ -181,24 +728,32 @@ async def check_if_white_label(vendor_id: str, region: Optional[str] = None) ->
     
     return 0
     
-async def _fetch_account_dict_by_vendor_id_from_db(vendor_id: str,  region: Optional[str] = None) -> Tuple[Dict[str,str], Dict[str,str], Optional[aiomysql.pool.Pool]]:
+async def _fetch_account_dict_by_vendor_id_from_db(vendor_id: str,  region: Optional[str] = None, context: Optional[ResolutionContext] = None) -> Tuple[Dict[str,str], Dict[str,str], Optional[aiomysql.pool.Pool]]:
     """
     Retrieves the account dictionary, account main data, and a database connection pool associated with a given vendor ID.
     
-    This function first fetches the vendor dictionary associated with the given vendor ID using the `_fetch_vendor_by_id_from_db` function.
-    If the vendor is found, it extracts the account ID and region, connects to the appropriate database using the `connect_to_db` function, and fetches the account details using the `fetch_one_query` function.
+    This function first fetches the vendor dictionary associated with the given vendor ID using the `_fetch_vendor_by_id_from_db` function, in the given region if there is one.
+    If the vendor is found, it extracts the account ID and region, takes the shared pool of the appropriate database using the `get_db_pool` function, and fetches the account details using the `fetch_one_query` function.
+    Rows already in the resolution context are used instead of being fetched again.
     If the account is found, it returns a tuple containing the account dictionary, account main data dictionary, and the database connection pool.
     Otherwise, it returns an error message and empty dictionaries.
 
     Args:
         vendor_id (str): The vendor ID to search for.
         region (Optional[str], optional): The region to search in. Defaults to None.
+        context (Optional[ResolutionContext], optional): The vendor and account rows already fetched by the caller. Defaults to None.
 
     Returns:
         Tuple[Dict[str, str], Dict[str, str], Optional[aiomysql.pool.Pool]]: A tuple containing the account dictionary,
             account main data dictionary, and a database connection pool (or None if no account is found).
     """  
-    vendor_dict = await _fetch_vendor_by_id_from_db(vendor_id=vendor_id)
+    context = context or ResolutionContext(region=region)
+    account_dict = None
+
+    if context.vendor and context.vendor.get('id') == vendor_id and context.vendor.get('accountId'):
+        vendor_dict = context.vendor
+    else:
+        vendor_dict = await _fetch_vendor_by_id_from_db(vendor_id=vendor_id, region=region)
 
     if not vendor_dict:
         return {'error': 'vendor was not found'} ,{} , None
@@ -210,99 +765,122 @@ async def _fetch_account_dict_by_vendor_id_from_db(vendor_id: str,  region: Opti
             
     # 2. fetch account dict
     if account_id and region:    
-        db_pool  = await connect_to_db(
-            user_name='USER_NAME', 
-            host=f'HOST_GENERAL_{region}', 
-            passwd=f'PASSWD_GENERAL_{region}'
-        )
+        db_pool = await get_db_pool(db_type=GENERAL, region=region)
         
-        account_dict = await fetch_one_query(
-            db_pool=db_pool, 
-            query=GET_ACCOUNT_DETAILS_BY_ID.format(f"'{account_id}'")
-        )          
+        if context.account and context.account.get('id') == account_id:
+            account_dict = context.account
+        else:
+            account_dict = await fetch_one_query(
+                db_pool=db_pool, 
+                query=GET_ACCOUNT_DETAILS_BY_ID,
+                args=(account_id,)
+            )          
           
     if not account_dict:            
         return {'error': 'account was not found'}, {}, None
     
-    return account_dict, {'account_id': vendor_dict.get('accountId'),'region': vendor_dict.get('region')}, db_pool
+    return account_dict, {'account_id': account_id, 'region': region}, db_pool
 
-async def _fetch_all_vendors_by_account_id_from_db(account_id: str, db_pool: aiomysql.pool.Pool) -> List[Vendor]:
+def _new_tree_semaphore(db_pool: aiomysql.pool.Pool) -> asyncio.Semaphore:
+    """
+    Creates the per-request semaphore bounding how many tree queries run at once, sized to the pool.
+
+    Args:
+        db_pool (aiomysql.pool.Pool): The database connection pool.
+
+    Returns:
+        asyncio.Semaphore: The semaphore to share between all the fetches of one tree.
+    """
+    return asyncio.Semaphore(getattr(db_pool, 'maxsize', None) or DB_POOL_MAX_SIZE)
+
+async def _fetch_all_bounded(db_pool: aiomysql.pool.Pool, query: str, args: Any = None, semaphore: Optional[asyncio.Semaphore] = None) -> Optional[List[Dict]]:
+    """
+    Runs `fetch_all_query` while holding a slot of the tree semaphore, if one is given.
+
+    Args:
+        db_pool (aiomysql.pool.Pool): The database connection pool.
+        query (str): The SQL query to execute.
+        args (Any, optional): Query arguments. Defaults to None.
+        semaphore (Optional[asyncio.Semaphore], optional): The per-request tree semaphore. Defaults to None.
+
+    Returns:
+        Optional[List[Dict]]: The fetched rows, or None if an error occurred.
+    """
+    if semaphore is None:
+        return await fetch_all_query(db_pool=db_pool, query=query, args=args)
+
+    async with semaphore:
+        return await fetch_all_query(db_pool=db_pool, query=query, args=args)
+
+async def _fetch_all_vendors_by_account_id_from_db(account_id: str, db_pool: aiomysql.pool.Pool, semaphore: Optional[asyncio.Semaphore] = None) -> List[Vendor]:
     """
     Retrieves a list of Vendor objects associated with a given account ID.
     
     This function first fetches all vendor IDs associated with the given account ID using the `fetch_all_query` function.
     It then creates a list of `Vendor` objects, populating each object with vendor data and a list of `Tenant` objects retrieved using the `_fetch_all_tenants_by_vendor_id_from_db` function.
+    The tenants of all vendors are fetched concurrently, bounded by a per-request semaphore sized to the pool, and the vendors keep the query order.
 
     Args:
         account_id (str): The account ID to search for.
         db_pool (aiomysql.pool.Pool): The database connection pool.
+        semaphore (Optional[asyncio.Semaphore], optional): The per-request tree semaphore. Defaults to a new one sized to the pool.
 
     Returns:
         List[Vendor]: A list of Vendor objects.
     """   
+    if semaphore is None:
+        semaphore = _new_tree_semaphore(db_pool=db_pool)
+
     #  4. use accountId to fetch all vendors for account
-    vendors_res = await fetch_all_query(db_pool=db_pool, query=GET_VENDORS_IDS_BY_ACCOUNT_ID_QUERY.format(f"'{account_id}'"))          
+    vendors_res = await _fetch_all_bounded(db_pool=db_pool, query=GET_VENDORS_IDS_BY_ACCOUNT_ID_QUERY, args=(account_id,), semaphore=semaphore)          
     # 5. generate vendors list into account model and fill with vendors data
-    vendors_list = []
-    
-    for vendor in vendors_res:
-        vendor_obj = Vendor(
-            id=vendor.get('id'),
-            env_name=vendor.get('environmentName'),
-            app_url=vendor.get('appURL'),
-            login_url=vendor.get('loginURL'),
-            host=vendor.get('host'),
-            country=vendor.get('country'),
-            fe_stack=vendor.get('frontendStack'),
-            be_stack=vendor.get('backendStack'),
-            account_id=vendor.get('accountId'),
-        )
-        
-        tenants_list = await _fetch_all_tenants_by_vendor_id_from_db(vendor_id=vendor.get('id'), db_pool=db_pool)
-            
+    vendors_list = [vendor_from_row(vendor) for vendor in vendors_res]
+    
+    tenants_lists = await asyncio.gather(
+        *[_fetch_all_tenants_by_vendor_id_from_db(vendor_id=vendor_obj.id, db_pool=db_pool, semaphore=semaphore) for vendor_obj in vendors_list]
+    )
+
+    for vendor_obj, tenants_list in zip(vendors_list, tenants_lists):
         vendor_obj.tenants = tenants_list
-        vendors_list.append(vendor_obj)
     
     return vendors_list
 
-async def _fetch_all_tenants_by_vendor_id_from_db(vendor_id: str, db_pool: aiomysql.pool.Pool) -> List[Tenant]:
+async def _fetch_all_tenants_by_vendor_id_from_db(vendor_id: str, db_pool: aiomysql.pool.Pool, semaphore: Optional[asyncio.Semaphore] = None) -> List[Tenant]:
     """
     Retrieves a list of Tenant objects associated with a given vendor ID.
     
     This function first fetches all tenant data associated with the given vendor ID using the `fetch_all_query` function.
     It then creates a list of `Tenant` objects, populating each object with tenant data, SSO configurations retrieved using the `_fetch_sso_configs_by_account_id_from_db` function, and SAML groups retrieved using the `_fetch_saml_groups_by_config_id_from_db` function.
+    The SSO configurations and SAML groups of all tenants are fetched concurrently and the tenants keep the query order.
 
     Args:
         vendor_id (str): The vendor ID to search for.
         db_pool (aiomysql.pool.Pool): The database connection pool.
+        semaphore (Optional[asyncio.Semaphore], optional): The per-request tree semaphore. Defaults to None.
 
     Returns:
         List[Tenant]: A list of Tenant objects.
     """   
     # 6. for each vendor get all tenans by:
-    tenants_res = await fetch_all_query(db_pool=db_pool, query=GET_ALL_TENANTS_BY_VENDOR_ID.format(f"'{vendor_id}'"))          
-    tenants_list = []
+    tenants_res = await _fetch_all_bounded(db_pool=db_pool, query=GET_ALL_TENANTS_BY_VENDOR_ID, args=(vendor_id,), semaphore=semaphore)          
 
     # 7. generate tenants list into vendor model and fill with tenat data
-    for tenant in tenants_res:
-        tenant_obj = Tenant(
-            id=tenant.get('accountId'),
-            name=tenant.get('name'),
-            meta_data=tenant.get('metadata'),
-            vendor_id=tenant.get('vendorId')
-        )
+    async def _build_tenant(tenant: Dict) -> Tenant:
+        tenant_obj = tenant_from_row(tenant)
         
-        sso_config_list, config_id = await _fetch_sso_configs_by_account_id_from_db(account_id=tenant.get('accountId'), db_pool=db_pool)     
-        saml_groups_list = await _fetch_saml_groups_by_config_id_from_db(config_id=config_id, db_pool=db_pool)
+        sso_config_list, config_id = await _fetch_sso_configs_by_account_id_from_db(account_id=tenant.get('accountId'), db_pool=db_pool, semaphore=semaphore)     
+        saml_groups_list = await _fetch_saml_groups_by_config_id_from_db(config_id=config_id, db_pool=db_pool, semaphore=semaphore)
         
         tenant_obj.sso_configs = sso_config_list
         tenant_obj.saml_groups = saml_groups_list
         
-        tenants_list.append(tenant_obj)
+        return tenant_obj
+
+    tenants_list = await asyncio.gather(*[_build_tenant(tenant) for tenant in tenants_res])
         
-    return tenants_list
+    return list(tenants_list)
 
-async def _fetch_sso_configs_by_account_id_from_db(account_id: str, db_pool: aiomysql.pool.Pool) -> Tuple[List[SSO_configs], str]:
+async def _fetch_sso_configs_by_account_id_from_db(account_id: str, db_pool: aiomysql.pool.Pool, semaphore: Optional[asyncio.Semaphore] = None) -> Tuple[List[SSO_configs], str]:
     """
     Retrieves a list of SSO configuration objects and the SSO configuration ID associated with a given account ID.
     
@@ -313,6 +891,7 @@ async def _fetch_sso_configs_by_account_id_from_db(account_id: str, db_pool: aio
     Args:
         account_id (str): The account ID to search for.
         db_pool (aiomysql.pool.Pool): The database connection pool.
+        semaphore (Optional[asyncio.Semaphore], optional): The per-request tree semaphore. Defaults to None.
 
     Returns:
         Tuple[List[SSO_configs], str]: A tuple containing a list of SSO configuration objects and the SSO configuration ID.
@@ -322,37 +901,21 @@ async def _fetch_sso_configs_by_account_id_from_db(account_id: str, db_pool: aio
     sso_config_obj_list = []
     
     # 8. for each tenant get all sso configs:
-    domains_list = await fetch_all_query(db_pool=db_pool, query=GET_SSO_DOMAINS_BY_TENANT.format(f"'{account_id}'"))      
+    domains_list = await _fetch_all_bounded(db_pool=db_pool, query=GET_SSO_DOMAINS_BY_TENANT, args=(account_id,), semaphore=semaphore)      
     for domain_row in domains_list:
         config_id = domain_row.get('ssoConfigId')
         
         if config_id:
-            sso_config_query = GET_SSO_CONFIGS_BY_SSO_CONFIG_ID.format(f"'{config_id}'")
-            sso_configs_list = await fetch_all_query(db_pool=db_pool, query=sso_config_query)
+            sso_configs_list = await _fetch_all_bounded(db_pool=db_pool, query=GET_SSO_CONFIGS_BY_SSO_CONFIG_ID, args=(config_id,), semaphore=semaphore)
     
     if sso_configs_list:
         for sso_config in sso_configs_list:
-            sso_config_obj = SSO_configs(
-                id=sso_config.get('id'),
-                vendorId=sso_config.get('vendorId'),
-                tenantId=sso_config.get('tenantId'),
-                domain=sso_config.get('domain'),
-                validated=sso_config.get('validated'),
-                ssoEndpoint=sso_config.get('ssoEndpoint'),
-                publicCertificate=sso_config.get('publicCertificate'),
-                signRequest=sso_config.get('signRequest'),
-                acsUrl=sso_config.get('acsUrl'),
-                type=sso_config.get('type'),
-                spEntityId=sso_config.get('spEntityId'),
-                config_metadata=sso_config.get('config_metadata'),
-                skipEmailDomainValidation=sso_config.get('skipEmailDomainValidation'),
-                overrideActiveTenant=sso_config.get('overrideActiveTenant'),
-            )
+            sso_config_obj = sso_config_from_row(sso_config)
             sso_config_obj_list.append(sso_config_obj)
     
     return sso_config_obj_list, config_id
     
-async def _fetch_saml_groups_by_config_id_from_db(config_id: str, db_pool: aiomysql.pool.Pool) -> List[SAML_groups]:
+async def _fetch_saml_groups_by_config_id_from_db(config_id: str, db_pool: aiomysql.pool.Pool, semaphore: Optional[asyncio.Semaphore] = None) -> List[SAML_groups]:
     """
     Retrieves a list of SAML group objects associated with a given SSO configuration ID.
     
@@ -362,23 +925,18 @@ async def _fetch_saml_groups_by_config_id_from_db(config_id: str, db_pool: aiomy
     Args:
         config_id (str): The SSO configuration ID to search for.
         db_pool (aiomysql.pool.Pool): The database connection pool.
+        semaphore (Optional[asyncio.Semaphore], optional): The per-request tree semaphore. Defaults to None.
 
     Returns:
         List[SAML_groups]: A list of SAML group objects.
     """
     saml_groups_obj = []
     
-    saml_groups_query = GET_SAML_GROUPS_BY_SSO_CONFIG_ID.format(f"'{config_id}'")
-    saml_groups = await fetch_all_query(db_pool=db_pool, query=saml_groups_query)
+    saml_groups = await _fetch_all_bounded(db_pool=db_pool, query=GET_SAML_GROUPS_BY_SSO_CONFIG_ID, args=(config_id,), semaphore=semaphore)
     
     if saml_groups:
         for saml_group in saml_groups:
-            saml_group_obj = SAML_groups(
-                id=saml_group.get('id'),
-                samlConfigId=saml_group.get('samlConfigId'),
-                enabled=saml_group.get('enabled'),
-                group=saml_group.get('group')
-            )
+            saml_group_obj = saml_group_from_row(saml_group)
             
             saml_groups_obj.append(saml_group_obj)
     
@@ -389,8 +947,8 @@ async def _fetch_account_tenant_id_by_customer_email_from_db(email: str, region:
     Retrieves the account tenant ID associated with a given customer email address.
     
     This function fetches the account tenant ID from the appropriate database based on the provided email address.
-    If no region is specified, it checks all databases using the `check_in_all_dbs` function. 
-    Otherwise, it connects to the database for the specified region.
+    If no region is specified, it looks it up with `locate_in_all_dbs`, which goes straight to the region it was last found in and probes all databases otherwise. 
+    Otherwise, it queries the shared pool of the specified region.
 
     Args:
         email (str): The customer email address to search for.
@@ -400,14 +958,11 @@ async def _fetch_account_tenant_id_by_customer_email_from_db(email: str, region:
         Optional[Dict]: A dictionary containing the account tenant ID, or None if no data is found.
     """
     if not region:
-        data = await check_in_all_dbs(func=fetching_account_tenant_id_by_email, db_type=IDENTITY, email=email)
+        data = await locate_in_all_dbs(kind=LOCATOR_EMAIL, key=email, func=fetching_account_tenant_id_by_email, db_type=IDENTITY, email=email)
     
     else:
-        db_pool  = await connect_to_db(user_name='USER_NAME', host=f'HOST_IDENTITY_{region}', passwd=f'PASSWD_IDENTITY_{region}')
+        db_pool = await get_db_pool(db_type=IDENTITY, region=region)
         data = await fetching_account_tenant_id_by_email(db_pool=db_pool,  email=email)
-        db_pool.close()     
-        await db_pool.wait_closed()
-
         
     if data:        
         return data
@@ -419,8 +974,8 @@ async def _fetch_tenant_id_by_account_tenant_id_from_db(account_tenant_id: str,
     Retrieves the tenant ID associated with a given account tenant ID.
     
     This function fetches the tenant ID from the appropriate database based on the provided account tenant ID.
-    If no region is specified, it checks all databases using the `check_in_all_dbs` function. 
-    Otherwise, it connects to the database for the specified region.
+    If no region is specified, it looks it up with `locate_in_all_dbs`, which goes straight to the region it was last found in and probes all databases otherwise. 
+    Otherwise, it queries the shared pool of the specified region.
 
     Args:
         account_tenant_id (str): The account tenant ID to search for.
@@ -430,13 +985,12 @@ async def _fetch_tenant_id_by_account_tenant_id_from_db(account_tenant_id: str,
         Optional[Dict]: A dictionary containing the tenant ID, or None if no data is found.
     """    
     if not region:
-        data = await check_in_all_dbs(func=fetching_account_id_by_account_tenant_id, account_tenant_id=account_tenant_id)
+        data = await locate_in_all_dbs(kind=LOCATOR_TENANT, key=account_tenant_id, func=fetching_account_id_by_account_tenant_id, account_tenant_id=account_tenant_id)
     
     else:
-        db_pool  = await connect_to_db(user_name='USER_NAME', host=f'HOST_GENERAL_{region}', passwd=f'PASSWD_GENERAL_{region}')
+        db_pool = await get_db_pool(db_type=GENERAL, region=region)
 
         data = await fetching_account_id_by_account_tenant_id(db_pool=db_pool,  account_tenant_id=account_tenant_id)
-        db_pool.close()     
         
     if data:       
         return data
@@ -448,8 +1002,8 @@ async def _fetch_vendor_id_by_account_id_from_db(account_id: str, region: Option
     Retrieves the vendor ID associated with a given account ID.
     
     This function fetches the vendor ID from the appropriate database based on the provided account ID.
-    If no region is specified, it checks all databases using the `check_in_all_dbs` function. 
-    Otherwise, it connects to the database for the specified region.
+    If no region is specified, it looks it up with `locate_in_all_dbs`, which goes straight to the region it was last found in and probes all databases otherwise. 
+    Otherwise, it queries the shared pool of the specified region.
 
     Args:
         account_id (str): The account ID to search for.
@@ -459,13 +1013,12 @@ async def _fetch_vendor_id_by_account_id_from_db(account_id: str, region: Option
         Optional[Dict]: A dictionary containing the vendor ID, or None if no data is found.
     """    
     if not region:
-        data = await check_in_all_dbs(func=fetching_vendor_id_by_account_id, account_id=account_id)
+        data = await locate_in_all_dbs(kind=LOCATOR_ACCOUNT, key=account_id, func=fetching_vendor_id_by_account_id, account_id=account_id)
     
     else:
-        db_pool  = await connect_to_db(user_name='USER_NAME', host=f'HOST_GENERAL_{region}', passwd=f'PASSWD_GENERAL_{region}')
+        db_pool = await get_db_pool(db_type=GENERAL, region=region)
 
         data = await fetching_vendor_id_by_account_id(db_pool=db_pool,  account_id=account_id)
-        db_pool.close()     
         
     if data:        
         return data
@@ -477,8 +1030,8 @@ async def _fetch_account_by_tenant_id_from_db(tenant_id: str, region: Optional[s
     Retrieves the account dictionary associated with a given tenant ID.
     
     This function fetches the account details from the appropriate database based on the provided tenant ID.
-    If no region is specified, it checks all databases using the `check_in_all_dbs` function.
-    Otherwise, it connects to the database for the specified region.
+    If no region is specified, it looks it up with `locate_in_all_dbs`, which goes straight to the region it was last found in and probes all databases otherwise.
+    Otherwise, it queries the shared pool of the specified region.
 
     Args:
         tenant_id (str): The tenant ID to search for.
@@ -488,15 +1041,12 @@ async def _fetch_account_by_tenant_id_from_db(tenant_id: str, region: Optional[s
         Optional[Dict]: A dictionary containing the account details, or None if no data is found.
     """
     if not region:
-        account_dict = await check_in_all_dbs(func=fetch_one_query, query=GET_ACCOUNT_BY_ID_QUERY.format(f"'{tenant_id}'"), db_type='GENERAL')
+        account_dict = await locate_in_all_dbs(kind=LOCATOR_TENANT, key=tenant_id, func=fetch_one_query, query=GET_ACCOUNT_BY_ID_QUERY, args=(tenant_id,), db_type=GENERAL)
         # region = account_dict.get('region')
         
     else:
-        db_pool  = await connect_to_db(user_name='USER_NAME', host=f'HOST_GENERAL_{region}', passwd=f'PASSWD_GENERAL_{region}')
-        account_dict = await fetch_one_query(db_pool=db_pool,  query=GET_ACCOUNT_BY_ID_QUERY.format(f"'{tenant_id}'"))
-
-        db_pool.close()     
-        await db_pool.wait_closed()
+        db_pool = await get_db_pool(db_type=GENERAL, region=region)
+        account_dict = await fetch_one_query(db_pool=db_pool,  query=GET_ACCOUNT_BY_ID_QUERY, args=(tenant_id,))
     
     return account_dict
 
@@ -504,9 +1054,9 @@ async def _fetch_vendor_by_id_from_db(vendor_id: str, region: Optional[str] = No
     """
     Retrieves the vendor dictionary associated with a given vendor ID.
     
-    This function first checks if a region is provided. If not, it attempts to retrieve the vendor data from all databases using the `check_in_all_dbs` function.
-    If a region is provided, it connects to the appropriate database using the `connect_to_db` function and fetches the vendor details using the `fetch_one_query` function.
-    Finally, it closes the database connection and returns the vendor dictionary.
+    This function first checks if a region is provided. If not, it attempts to retrieve the vendor data with `locate_in_all_dbs`, which goes straight to the region it was last found in and probes all databases otherwise.
+    If a region is provided, it takes the shared pool of the appropriate database using the `get_db_pool` function and fetches the vendor details using the `fetch_one_query` function.
+    Finally, it returns the vendor dictionary. Concurrent lookups of the same vendor and region share one in-flight query.
 
     Args:
         vendor_id (str): The vendor ID to search for.
@@ -515,63 +1065,114 @@ async def _fetch_vendor_by_id_from_db(vendor_id: str, region: Optional[str] = No
     Returns:
         Optional[Dict]: A dictionary containing the vendor data, or None if no vendor is found.
     """
+    return await lookup_flights.do(
+        key=('vendor', vendor_id, _flight_region(region)),
+        func=lambda: _load_vendor_by_id(vendor_id=vendor_id, region=region)
+    )
+
+async def _load_vendor_by_id(vendor_id: str, region: Optional[str] = None) -> Optional[Dict]:
     if not region:
-        vendor_dict = await check_in_all_dbs(func=fetch_one_query, query=GET_VENDOR_BY_ID_QUERY.format(f"'{vendor_id}'"), db_type='GENERAL')
+        vendor_dict = await locate_in_all_dbs(kind=LOCATOR_VENDOR, key=vendor_id, func=fetch_one_query, query=GET_VENDOR_BY_ID_QUERY, args=(vendor_id,), db_type=GENERAL)
 
     else:         
-        db_pool  = await connect_to_db(user_name='USER_NAME', host=f'HOST_GENERAL_{region}', passwd=f'PASSWD_GENERAL_{region}')
-        vendor_dict = await fetch_one_query(db_pool=db_pool,  query=GET_VENDOR_BY_ID_QUERY.format(f"'{vendor_id}'"))
-        db_pool.close()     
-        await db_pool.wait_closed()
+        db_pool = await get_db_pool(db_type=GENERAL, region=region)
+        vendor_dict = await fetch_one_query(db_pool=db_pool,  query=GET_VENDOR_BY_ID_QUERY, args=(vendor_id,))
     
     return vendor_dict
     
-async def handle_white_label_process(vendor_id: str, account_id: str, is_enabled: str, region: str) -> Optional[Dict[str,str]]:
+async def get_white_label_modes(vendor_ids: List[str], region: str = 'EU') -> Dict[str,Any]:
+    """
+    Retrieves the white label mode of several vendors with a single query.
+
+    Args:
+        vendor_ids (List[str]): The vendor IDs to check.
+        region (str, optional): The region of the vendors. Defaults to 'EU'.
+
+    Returns:
+        Dict[str, Any]: The `whiteLabelMode` of each vendor, keyed by vendor ID. Unknown vendors are left out.
+    """
+    db_pool = await get_db_pool(db_type=GENERAL, region=region)
+    vendors_res = await fetch_all_in_chunks(db_pool=db_pool, query=GET_WHITE_LABEL_MODE_BY_VENDOR_IDS, values=vendor_ids)
+
+    return {vendor.get('id'): vendor.get('whiteLabelMode') for vendor in vendors_res}
+
+async def _send_white_label_requests(vendor_ids: List[str], is_enabled: bool, region: str) -> List[Dict[str,Any]]:
+    semaphore = asyncio.Semaphore(WHITE_LABEL_CONCURRENCY)
+
+    async def _send(vendor_id: str) -> Dict[str,Any]:
+        async with semaphore:
+            started = time.perf_counter()
+            response = await request_white_lable(is_enabled=is_enabled, vendor_id=vendor_id, region=region)
+
+        return {
+            'vendor_id': vendor_id,
+            'status_code': response.get('status_code'),
+            'duration_ms': round((time.perf_counter() - started) * 1000, 1)
+        }
+
+    return await asyncio.gather(*[_send(vendor_id) for vendor_id in vendor_ids])
+
+async def handle_white_label_process(vendor_id: str, account_tenant_id: str, is_enabled: str, region: str) -> Optional[Dict[str,str]]:
+    """
+    Enables white label mode on every environment of the account a vendor belongs to.
+
+    The requests to the FrontEgg API are sent concurrently, at most WHITE_LABEL_CONCURRENCY at a time, and the
+    white label mode of every environment that accepted the request is then checked with a single query.
+
+    Args:
+        vendor_id (str): The ID of one of the account's vendors.
+        account_tenant_id (str): The account tenant ID. Not supported yet.
+        is_enabled (str): Whether white label mode should be enabled.
+        region (str): The region of the vendor. When empty, the region the vendor is found in is used.
+
+    Returns:
+        Optional[Dict[str, str]]: The number of environments, the white labeled environments and the outcome and
+            duration of the request of each environment.
+    """
     # should implement the accounttenantid process
     
-    if not account_id and not vendor_id:
+    if not account_tenant_id and not vendor_id:
         return jsonify({'error': 'None'})
         
     stripped_vendor_id = str(vendor_id).strip('\'"')
     is_valid = validate_uuid(uuid_string=stripped_vendor_id)
-    white_label_counter = 0
-    white_label_vendors = []
     
     if not is_valid:
         return jsonify({'error': 'Invalid ID'})
     
     if bool(is_enabled):
-        production_client_id, production_secret = get_production_env_variables()
+        started = time.perf_counter()
+        env_ids = None
 
-        auth_response = authenticate_as_vendor(
-            production_client_id=production_client_id, 
-            production_client_secret=production_secret
-            )
-    
-        account_id = await get_account_id_by_vendor_id(vendor_id=stripped_vendor_id, region=region)
+        if not region:
+            vendor_dict = await _fetch_vendor_by_id_from_db(vendor_id=stripped_vendor_id)
+            region = vendor_dict.get('region') if vendor_dict else None
+
+        account_id = await get_account_id_by_vendor_id(vendor_id=stripped_vendor_id, region=region) if region else None
 
         if account_id:
             env_ids = await get_vendors_ids_by_account_id(account_id=account_id, region=region)            
 
         if env_ids:
-            for id in env_ids:    
-
-                response = request_white_lable(
-                    is_enabled=is_enabled, 
-                    vendor_id=id, 
-                    token=auth_response.get('token'),
-                    region=region
-                    )
-                
-                if response.get('status_code') == 200:
-                    print("\nMAIN\n", id)
-                    is_vendor_white_label = await check_if_white_label(vendor_id=id, region=region)
-                    
-                    if is_vendor_white_label != 0:
-                        white_label_counter += 1
-                        white_label_vendors.append(id)
+            results = await _send_white_label_requests(vendor_ids=env_ids, is_enabled=is_enabled, region=region)
+            accepted_ids = [result.get('vendor_id') for result in results if result.get('status_code') == 200]
+            white_label_modes = await get_white_label_modes(vendor_ids=accepted_ids, region=region) if accepted_ids else {}
+
+            for result in results:
+                result['white_labeled'] = white_label_modes.get(result.get('vendor_id')) == 1
+
+            white_label_vendors = [result.get('vendor_id') for result in results if result.get('white_labeled')]
+
+            invalidate_account(account_id=account_id)
                                 
-            return jsonify({'status_code': 200, 'number_of_envs': len(env_ids), 'white_labeled': white_label_counter, 'white_labeled_vendors': white_label_vendors})        
+            return jsonify({
+                'status_code': 200,
+                'number_of_envs': len(env_ids),
+                'white_labeled': len(white_label_vendors),
+                'white_labeled_vendors': white_label_vendors,
+                'vendors': results,
+                'duration_ms': round((time.perf_counter() - started) * 1000, 1)
+            })        
     
     return jsonify({'error': 'You selected the body-param as disabled'})
 
@@ -580,46 +1181,126 @@ async def handle_white_label_process(vendor_id: str, account_id: str, is_enabled
 async def remove_trial_process(vendor_id: str, region: Optional[str] = None) -> Optional[Dict]:
     
     if not region:
-        data = await check_in_all_dbs(func=fetching_tenant_dict_from_db, client_id=vendor_id)
+        data = await locate_in_all_dbs(kind=LOCATOR_VENDOR, key=vendor_id, func=fetching_tenant_dict_from_db, client_id=vendor_id)
         data = dict(data)
         
     else:
-        db_pool  = await connect_to_db(user_name='USER_NAME', host=f'HOST_GENERAL_{region}', passwd=f'PASSWD_GENERAL_{region}')
+        db_pool = await get_db_pool(db_type=GENERAL, region=region)
 
         data = await fetching_tenant_dict_from_db(db_pool=db_pool, client_id=vendor_id)
-        db_pool.close()     
         
     if data:
-        production_client_id, production_secret = get_production_env_variables()
-        auth_response = authenticate_as_vendor(production_client_id=production_client_id, production_client_secret=production_secret)
-        result = remove_trial_request(tenant_id=data.get('tenant_id'), id=data.get('id'), production_vendor_token=auth_response.get('token'))
+        result = await remove_trial_request(tenant_id=data.get('tenant_id'), id=data.get('id'))
+        invalidate_account(account_id=data.get('account_id'), vendor_id=vendor_id)
         
         if result:
             return result
         
     return None
 
+async def remove_trial_bulk_process(vendor_ids: List[str], region: Optional[str] = None, dry_run: bool = False) -> Dict[str,Any]:
+    """
+    Removes the trial of many vendors at once.
+
+    The tenant configurations of the vendors are resolved with `fetching_tenant_dicts_from_db`, in the given region or
+    in every region concurrently. The subscription requests are then sent concurrently, at most REMOVE_TRIAL_CONCURRENCY
+    at a time, all with the same cached vendor token. Vendors of the same account share one tenant configuration, which
+    is only updated once. A region that fails does not fail the others: the vendors no other region found are
+    reported with the failed regions instead of as not found.
+
+    Args:
+        vendor_ids (List[str]): The vendor IDs.
+        region (Optional[str], optional): The region of the vendors. Defaults to None, which searches every region.
+        dry_run (bool, optional): Whether to only resolve the tenant configurations without removing any trial. Defaults to False.
+
+    Returns:
+        Dict[str, Any]: The number of vendors, how many were found and removed, and the outcome of each vendor.
+    """
+    vendor_ids = list(dict.fromkeys(vendor_ids))
+    regions = [region] if region else REGIONS
+    tenant_dicts = {}
+    failed_regions = []
+
+    for region_name, region_tenant_dicts in zip(regions, await asyncio.gather(
+        *[_fetch_tenant_dicts_in_region(vendor_ids=vendor_ids, region=region_name) for region_name in regions],
+        return_exceptions=True
+    )):
+        if isinstance(region_tenant_dicts, Exception):
+            print(f"Remove trial lookup Error in {region_name}: {region_tenant_dicts}")
+            failed_regions.append(region_name)
+            continue
+
+        for vendor_id, data in region_tenant_dicts.items():
+            tenant_dicts.setdefault(vendor_id, dict(data, region=region_name))
+
+    status_codes = {}
+
+    if not dry_run:
+        semaphore = asyncio.Semaphore(REMOVE_TRIAL_CONCURRENCY)
+        configurations = {(data.get('tenant_id'), data.get('id')) for data in tenant_dicts.values()}
+
+        async def _remove(tenant_id: str, id: str) -> None:
+            async with semaphore:
+                status_codes[(tenant_id, id)] = await remove_trial_request(tenant_id=tenant_id, id=id)
+
+        await asyncio.gather(*[_remove(tenant_id, id) for tenant_id, id in configurations])
+
+        for data in tenant_dicts.values():
+            invalidate_account(account_id=data.get('account_id'))
+
+    results = []
+
+    for vendor_id in vendor_ids:
+        data = tenant_dicts.get(vendor_id)
+
+        if not data and failed_regions:
+            results.append({'vendor_id': vendor_id, 'error': f'lookup failed in {", ".join(failed_regions)}'})
+            continue
+
+        if not data:
+            results.append({'vendor_id': vendor_id, 'error': 'vendor or tenant configuration was not found'})
+            continue
+
+        result = {'vendor_id': vendor_id, **data}
+
+        if not dry_run:
+            result['status_code'] = status_codes.get((data.get('tenant_id'), data.get('id')))
+
+        results.append(result)
+
+    return {
+        'dry_run': dry_run,
+        'number_of_vendors': len(vendor_ids),
+        'found': len(tenant_dicts),
+        'removed': len([result for result in results if result.get('status_code') == 200]),
+        'vendors': results
+    }
+
+async def _fetch_tenant_dicts_in_region(vendor_ids: List[str], region: str) -> Dict[str,Dict[str,str]]:
+    db_pool = await get_db_pool(db_type=GENERAL, region=region)
+    tenant_dicts = await fetching_tenant_dicts_from_db(db_pool=db_pool, client_ids=vendor_ids)
+
+    for vendor_id in tenant_dicts:
+        remember_region(kind=LOCATOR_VENDOR, key=vendor_id, region=region)
+
+    return tenant_dicts
+
 async def get_account_id_by_vendor_id(vendor_id: str, region: str = 'EU') -> Optional[str]:
     
-    db_pool  = await connect_to_db(user_name='USER_NAME', host=f'HOST_GENERAL_{region}', passwd=f'PASSWD_GENERAL_{region}')
+    db_pool = await get_db_pool(db_type=GENERAL, region=region)
      
-    vendor_query_result = await fetch_one_query(db_pool=db_pool, query=GET_VENDOR_BY_ID_QUERY.format(f"'{vendor_id}'"))
+    vendor_query_result = await fetch_one_query(db_pool=db_pool, query=GET_VENDOR_BY_ID_QUERY, args=(vendor_id,))
     if vendor_query_result:
-        db_pool.close()     
-        
         return vendor_query_result.get('accountId')
-    
-    db_pool.close()     
         
     return None
 
 async def get_vendors_ids_by_account_id(account_id: str, region: str = 'EU') -> Optional[List[str]]:
     
-    db_pool  = await connect_to_db(user_name='USER_NAME', host=f'HOST_GENERAL_{region}', passwd=f'PASSWD_GENERAL_{region}')
+    db_pool = await get_db_pool(db_type=GENERAL, region=region)
     
-    vendor_query_result = await fetch_all_query(db_pool=db_pool, query=GET_VENDORS_IDS_BY_ACCOUNT_ID_QUERY.format(f"'{account_id}'"))
+    vendor_query_result = await fetch_all_query(db_pool=db_pool, query=GET_VENDORS_IDS_BY_ACCOUNT_ID_QUERY, args=(account_id,))
     if vendor_query_result:     
-        db_pool.close()     
         env_list = []
         
         for vendor in vendor_query_result:
@@ -627,7 +1308,6 @@ async def get_vendors_ids_by_account_id(account_id: str, region: str = 'EU') ->
         
         return env_list
     
-    db_pool.close()  
     return None
 
 
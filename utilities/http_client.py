@@ -0,0 +1,109 @@
+import asyncio
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, Mapping, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from consts import HTTP_CONNECT_TIMEOUT, HTTP_KEEPALIVE_TIMEOUT, HTTP_POOL_LIMIT_PER_HOST, HTTP_TIMEOUT
+from utilities.event_loop import register_shutdown_hook
+
+_sessions: Dict[str, aiohttp.ClientSession] = {}
+
+
+@dataclass
+class HttpResponse:
+    status_code: int = None
+    text: str = ''
+    headers: Mapping[str, str] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def json(self) -> Any:
+        """
+        Parses the response body as JSON.
+
+        Returns:
+            Any: The parsed body, or an error dictionary if the request failed or the body is not JSON.
+        """
+        if self.error:
+            return {'error': self.error}
+
+        try:
+            return json.loads(self.text) if self.text else {}
+        except ValueError:
+            return {'error': f'Invalid JSON response ({self.status_code})'}
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+
+    return f'{parts.scheme}://{parts.netloc}'
+
+def get_session(url: str) -> aiohttp.ClientSession:
+    """
+    Returns the keep-alive session of the host of a URL, creating it on first use.
+
+    There is one session, and so one connection pool, per base URL (the `BaseUrl` members and the Zendesk host).
+    Sessions live until `close_all_sessions` runs on shutdown.
+
+    Args:
+        url (str): Any URL on the host.
+
+    Returns:
+        aiohttp.ClientSession: The shared session of the host.
+    """
+    origin = _origin(url)
+    session = _sessions.get(origin)
+
+    if session is None or session.closed:
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit_per_host=HTTP_POOL_LIMIT_PER_HOST, keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT),
+            timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        )
+        _sessions[origin] = session
+
+    return session
+
+async def http_request(method: str, url: str, headers: Optional[Dict[str, str]] = None, json: Any = None, timeout: Optional[float] = None) -> HttpResponse:
+    """
+    Sends an HTTP request through the pooled session of the URL's host without blocking the event loop.
+
+    Args:
+        method (str): The HTTP method.
+        url (str): The full URL.
+        headers (Optional[Dict[str, str]], optional): The request headers. Defaults to None.
+        json (Any, optional): A body to send as JSON. Defaults to None.
+        timeout (Optional[float], optional): Total timeout of this call in seconds. Defaults to HTTP_TIMEOUT.
+
+    Returns:
+        HttpResponse: The status code, body and headers of the response. Network errors and timeouts are logged
+            and returned with `status_code` None and the `error` set.
+    """
+    request_timeout = aiohttp.ClientTimeout(total=timeout, connect=HTTP_CONNECT_TIMEOUT) if timeout else None
+
+    try:
+        async with get_session(url).request(method, url, headers=headers, json=json, timeout=request_timeout) as response:
+            text = await response.text()
+
+            return HttpResponse(status_code=response.status, text=text, headers=dict(response.headers))
+
+    except asyncio.TimeoutError:
+        print(f"HTTP Timeout: {method} {url}")
+        return HttpResponse(error='Request timed out')
+    except aiohttp.ClientError as e:
+        print(f"HTTP Error: {e}")
+        return HttpResponse(error=str(e))
+
+async def close_all_sessions() -> None:
+    """
+    Closes every pooled HTTP session.
+    """
+    sessions = list(_sessions.values())
+    _sessions.clear()
+
+    for session in sessions:
+        await session.close()
+
+
+register_shutdown_hook(close_all_sessions)
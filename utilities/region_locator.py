@@ -0,0 +1,89 @@
+from typing import Any, Callable, Dict, Optional
+
+from consts import GENERAL, REGION_LOCATOR_MAX_SIZE, REGION_LOCATOR_TTL
+from utilities.cache import TTLCache
+from utilities.db_and_queries.connections_and_queries import check_in_all_dbs
+from utilities.db_and_queries.pool_registry import get_db_pool
+
+LOCATOR_VENDOR = 'vendor'
+LOCATOR_TENANT = 'tenant'
+LOCATOR_ACCOUNT = 'account'
+LOCATOR_EMAIL = 'email'
+
+region_locator = TTLCache(name='region_locator', maxsize=REGION_LOCATOR_MAX_SIZE, ttl=REGION_LOCATOR_TTL)
+
+
+def get_known_region(kind: str, key: str) -> Optional[str]:
+    """
+    Returns the region an ID or email was last found in.
+
+    Args:
+        kind (str): The kind of key, one of the LOCATOR_* constants.
+        key (str): The ID or email.
+
+    Returns:
+        Optional[str]: The region, or None if it is unknown or stale.
+    """
+    if not key:
+        return None
+
+    return region_locator.get((kind, key))
+
+def remember_region(kind: str, key: str, region: Optional[str]) -> None:
+    """
+    Records the region an ID or email was found in.
+
+    Args:
+        kind (str): The kind of key, one of the LOCATOR_* constants.
+        key (str): The ID or email.
+        region (Optional[str]): The region it was found in. Nothing is recorded when empty.
+    """
+    if key and region:
+        region_locator.set((kind, key), region)
+
+def forget_region(kind: str, key: str) -> None:
+    """
+    Drops the recorded region of an ID or email.
+
+    Args:
+        kind (str): The kind of key, one of the LOCATOR_* constants.
+        key (str): The ID or email.
+    """
+    region_locator.pop((kind, key))
+
+async def locate_in_all_dbs(kind: str, key: str, func: Callable[..., Any], db_type: Optional[str] = GENERAL, **kwargs: Any) -> Optional[Dict[str,str]]:
+    """
+    Region-less lookup that goes straight to the region the key was last found in.
+
+    When the locator knows the region of the key, only that region is queried. On a locator miss, or when the
+    remembered region no longer has the data, it falls back to probing every region with `check_in_all_dbs`
+    and remembers the region of the hit.
+
+    Args:
+        kind (str): The kind of key, one of the LOCATOR_* constants.
+        key (str): The ID or email being looked up.
+        func (Callable[..., Any]): The function to call for fetching the data.
+        db_type (Optional[str], optional): The type of database to connect to. Defaults to 'GENERAL'.
+        **kwargs: Additional keyword arguments to pass to the function.
+
+    Returns:
+        Optional[Dict[str, str]]: A dictionary containing the fetched data and the region, or None if no data is found.
+    """
+    region = get_known_region(kind=kind, key=key)
+
+    if region:
+        db_pool = await get_db_pool(db_type=db_type, region=region)
+        data = await func(db_pool=db_pool, **kwargs)
+
+        if data:
+            data['region'] = region
+            return data
+
+        forget_region(kind=kind, key=key)
+
+    data = await check_in_all_dbs(func, db_type, **kwargs)
+
+    if data:
+        remember_region(kind=kind, key=key, region=data.get('region'))
+
+    return data
@@ -0,0 +1,194 @@
+import dataclasses
+import hashlib
+import json
+from json.encoder import encode_basestring_ascii
+from typing import Any, Callable, Dict, FrozenSet, Tuple
+
+from flask import Response, current_app, request
+from flask.json.provider import DefaultJSONProvider
+
+from consts import ENCODER_CACHE_MAX_SIZE, ENCODER_CACHE_TTL, JSON_BACKEND
+from models.models import Account
+from utilities.account_cache import get_account_etag, remember_account_etag
+from utilities.cache import TTLCache
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# same settings as Flask's jsonify outside debug mode, so the bytes are identical
+_fallback_encoder = json.JSONEncoder(ensure_ascii=True, sort_keys=True, separators=(',', ':'), default=DefaultJSONProvider.default)
+# model -> encoder of all its fields, one per model class
+_encoders: Dict[type, Callable[[Any], str]] = {}
+# (model, fieldsets) -> encoder filtering by TreeOptions.fieldsets; these come from the request, so the cache is bounded
+_fieldset_encoders = TTLCache(name='fieldset_encoders', maxsize=ENCODER_CACHE_MAX_SIZE, ttl=ENCODER_CACHE_TTL)
+
+Fieldsets = Tuple[Tuple[type, FrozenSet[str]], ...]
+
+
+def compile_encoder(model: type, fieldsets: Fieldsets = ()) -> Callable[[Any], str]:
+    """
+    Generates the JSON encoder of a dataclass model, once per class and fieldsets.
+
+    The encoder is a single concatenation of the model's keys, in sorted order and pre-escaped, with the encoded
+    value of each field, so serializing an instance neither inspects its class nor builds an intermediate dict.
+    Encoders of all fields are kept for good; filtering ones are kept in a bounded LRU, since their fieldsets come
+    from the request.
+
+    Args:
+        model (type): The model dataclass.
+        fieldsets (Fieldsets, optional): The fields to encode for each model, as in TreeOptions. Models that are not
+            listed are encoded with all their fields. Defaults to () (all fields of every model).
+
+    Returns:
+        Callable[[Any], str]: The encoder, taking a model instance and returning its JSON text.
+    """
+    encoder = _fieldset_encoders.get((model, fieldsets)) if fieldsets else _encoders.get(model)
+
+    if encoder is not None:
+        return encoder
+
+    selected = dict(fieldsets).get(model)
+    names = sorted(field.name for field in dataclasses.fields(model) if selected is None or field.name in selected)
+    parts = [f'{(("{" if index == 0 else ",") + encode_basestring_ascii(name) + ":")!r} + value(obj.{name})' for index, name in enumerate(names)]
+    body = ' + '.join(parts) + " + '}'" if parts else "'{}'"
+    namespace = {'value': (lambda value: encode_value(value, fieldsets)) if fieldsets else encode_value}
+
+    exec(f'def encode(obj):\n    return {body}\n', namespace)
+
+    encoder = namespace['encode']
+    encoder.__name__ = encoder.__qualname__ = f'encode_{model.__name__}'
+
+    if fieldsets:
+        _fieldset_encoders.set((model, fieldsets), encoder)
+    else:
+        _encoders[model] = encoder
+
+    return encoder
+
+def encode_value(value: Any, fieldsets: Fieldsets = ()) -> str:
+    """
+    Encodes any value of an account payload (models, lists, dicts and scalars) as compact JSON text.
+
+    Args:
+        value (Any): The value to encode.
+        fieldsets (Fieldsets, optional): The fields to encode for each model, see `compile_encoder`. Defaults to ().
+
+    Returns:
+        str: The JSON text, identical to what `jsonify` produces for the equivalent dict tree.
+    """
+    if value is None:
+        return 'null'
+
+    value_type = type(value)
+
+    if value_type is str:
+        return encode_basestring_ascii(value)
+
+    if value_type is int:
+        return int.__repr__(value)
+
+    if value_type is list or value_type is tuple:
+        return '[' + ','.join([encode_value(item, fieldsets) for item in value]) + ']'
+
+    encoder = None if fieldsets else _encoders.get(value_type)
+
+    if encoder is not None:
+        return encoder(value)
+
+    if value_type is dict and all(type(key) is str for key in value):
+        return '{' + ','.join([encode_basestring_ascii(key) + ':' + encode_value(value[key], fieldsets) for key in sorted(value)]) + '}'
+
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return compile_encoder(value_type, fieldsets)(value)
+
+    return _fallback_encoder.encode(value)
+
+def encode_head(obj: Any, open_field: str, fieldsets: Fieldsets = ()) -> str:
+    """
+    Encodes a model up to the value of its last field, so that value can be streamed after it.
+
+    Args:
+        obj (Any): The model instance.
+        open_field (str): The field that is left open. It must be the last one in sorted order.
+        fieldsets (Fieldsets, optional): The fields to encode for each model, see `compile_encoder`. Defaults to ().
+
+    Returns:
+        str: The JSON text of the other fields followed by the key of `open_field`, e.g. `{"id":"1","vendors":`.
+    """
+    selected = dict(fieldsets).get(type(obj))
+    names = sorted(field.name for field in dataclasses.fields(obj) if selected is None or field.name in selected)
+
+    if not names or names[-1] != open_field:
+        raise ValueError(f'{open_field} is not the last field of {type(obj).__name__}')
+
+    head = encode_value({name: getattr(obj, name) for name in names[:-1]}, fieldsets)
+
+    return (head[:-1] + ',' if len(names) > 1 else '{') + encode_basestring_ascii(open_field) + ':'
+
+def dumps_json(obj: Any, fieldsets: Fieldsets = ()) -> bytes:
+    """
+    Serializes an account payload to the bytes of a JSON response body.
+
+    With JSON_BACKEND set to 'orjson' (and orjson installed) the payload is serialized by orjson. The JSON is the same,
+    but non-ASCII text is written as UTF-8 instead of `\\u` escapes. orjson cannot filter fields, so payloads with
+    fieldsets always use the compiled encoders.
+
+    Args:
+        obj (Any): The payload: models, lists, dicts and scalars.
+        fieldsets (Fieldsets, optional): The fields to encode for each model, see `compile_encoder`. Defaults to ().
+
+    Returns:
+        bytes: The JSON text followed by a newline, like `jsonify`.
+    """
+    if JSON_BACKEND == 'orjson' and orjson is not None and not fieldsets:
+        return orjson.dumps(obj, default=DefaultJSONProvider.default, option=orjson.OPT_SORT_KEYS | orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS)
+
+    return (encode_value(obj, fieldsets) + '\n').encode('ascii')
+
+def json_response(obj: Any, fieldsets: Fieldsets = ()) -> Response:
+    """
+    Creates the JSON response of an endpoint without going through `jsonify`.
+
+    The response carries an ETag, a hash of its body, and a request whose `If-None-Match` has it gets an empty 304.
+    The ETag of an account tree is remembered in the account cache, so a 304 for a cached tree is answered without
+    serializing it again.
+
+    Args:
+        obj (Any): The payload, or a ready response which is returned as is.
+        fieldsets (Fieldsets, optional): The fields to encode for each model, see `compile_encoder`. Defaults to ().
+
+    Returns:
+        Response: The response.
+    """
+    if isinstance(obj, Response):
+        return obj
+
+    is_account = isinstance(obj, Account)
+    etag = get_account_etag(account=obj, fieldsets=fieldsets) if is_account else None
+
+    if etag and request.if_none_match.contains_weak(etag):
+        return _not_modified(etag=etag)
+
+    body = dumps_json(obj, fieldsets)
+
+    if etag is None:
+        etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+
+        if is_account:
+            remember_account_etag(account=obj, etag=etag, fieldsets=fieldsets)
+
+        if request.if_none_match.contains_weak(etag):
+            return _not_modified(etag=etag)
+
+    response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+
+    return response
+
+def _not_modified(etag: str) -> Response:
+    response = current_app.response_class(status=304)
+    response.set_etag(etag)
+
+    return response
@@ -0,0 +1,52 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one in-flight computation.
+
+    The first caller of a key starts the computation; callers arriving while it runs await the same task and get
+    the same result (or exception). Nothing is kept once the task is done, so this is not a cache.
+    Like the caches, it is only used from the background event loop and needs no locking.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Runs `func` unless a call for `key` is already in flight, in which case its result is awaited instead.
+
+        The shared task is shielded, so a caller that is cancelled (e.g. a client that disconnected) does not
+        cancel the computation for the others.
+
+        Args:
+            key (Hashable): The normalized lookup key.
+            func (Callable[[], Awaitable[Any]]): Starts the computation.
+
+        Returns:
+            Any: The result of the computation.
+        """
+        task = self._calls.get(key)
+
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda done_task: self._forget(key, done_task))
+        else:
+            self.shared += 1
+
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+        if not task.cancelled():
+            # the exception was delivered to the callers, don't let asyncio log it as never retrieved
+            task.exception()
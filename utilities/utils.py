@@ -1,11 +1,12 @@
 from enum import Enum
 import re
-from typing import Tuple
+from typing import Any, Dict, Optional, Tuple
 
 from .db_and_queries.connections_and_queries import *
 from dotenv import load_dotenv
 from consts import *
-import requests
+from .http_client import HttpResponse, http_request
+from .vendor_token import VendorTokenManager
 import os
 import uuid
 
@@ -36,7 +37,7 @@ def validate_uuid(uuid_string: str) -> bool:
     
     return is_valid
 
-def authenticate_as_vendor(production_client_id: str, production_client_secret: str):
+async def authenticate_as_vendor(production_client_id: str, production_client_secret: str):
     """
     Authenticates with the FrontEgg API as a vendor using the provided production client ID and secret.
 
@@ -56,34 +57,28 @@ def authenticate_as_vendor(production_client_id: str, production_client_secret:
         "clientId": production_client_id,
         "secret": production_client_secret
     }
-    response = requests.post(url, headers=headers, json=data)
+    response = await http_request("POST", url, headers=headers, json=data)
 
     return response.json()
 
-def remove_trial_request(tenant_id, id, production_vendor_token):
+async def remove_trial_request(tenant_id, id):
     """
     Sends a PUT request to the FrontEgg API to remove a trial request for a specific tenant and configuration ID.
 
     Args:
         tenant_id (str): The ID of the tenant for which the trial request should be removed.
         id (str): The configuration ID for which the trial request should be removed.
-        production_vendor_token (str): The authentication token for the vendor.
 
     Returns:
         int: The HTTP status code of the API response.
     """
     url = BASE_EU_PATH + SUBSCRIPTION_CONFIGURATION + tenant_id
-    headers = {
-        "accept": "application/json",
-        "content-type": "application/json",
-        "Authorization": f"Bearer {production_vendor_token}"
-    }
     payload = {
         "providerType": "Stripe",
         "externallyManaged": "prod_M81QRPpLeQ8Sea",
         "configurationId": id   
     }
-    response = requests.put(url, headers=headers, json=payload)
+    response = await vendor_request("PUT", url, payload=payload)
     return response.status_code
 
 def get_production_env_variables() -> Tuple[str,str]:    
@@ -99,33 +94,65 @@ def get_production_env_variables() -> Tuple[str,str]:
     
     return production_client_id, production_secret
 
-def request_white_lable(is_enabled: bool, vendor_id: str, token: str, region: str = 'EU') -> Tuple[str,str]:
+async def _fetch_vendor_token() -> Dict[str, Any]:
+    production_client_id, production_secret = get_production_env_variables()
+
+    return await authenticate_as_vendor(production_client_id=production_client_id, production_client_secret=production_secret)
+
+vendor_token_manager = VendorTokenManager(
+    fetch_token=_fetch_vendor_token,
+    refresh_margin=VENDOR_TOKEN_REFRESH_MARGIN,
+    default_ttl=VENDOR_TOKEN_DEFAULT_TTL
+)
+
+async def vendor_request(method: str, url: str, payload: Optional[Dict[str, Any]] = None) -> HttpResponse:
+    """
+    Sends a request to the FrontEgg API authenticated with the cached vendor token.
+
+    If the token is rejected with a 401 it is dropped, a new one is fetched and the request is retried once.
+
+    Args:
+        method (str): The HTTP method.
+        url (str): The full URL.
+        payload (Optional[Dict[str, Any]], optional): The JSON body. Defaults to None.
+
+    Returns:
+        HttpResponse: The response of the API.
+    """
+    for attempt in range(2):
+        token = await vendor_token_manager.get_token()
+        headers = {
+            "accept": "application/json",
+            "content-type": "application/json",
+            "Authorization": f"Bearer {token}"
+        }
+        response = await http_request(method, url, headers=headers, json=payload)
+
+        if response.status_code != 401 or attempt:
+            return response
+
+        vendor_token_manager.invalidate(token=token)
+
+async def request_white_lable(is_enabled: bool, vendor_id: str, region: str = 'EU') -> Tuple[str,str]:
     """
     Sends a PUT request to the FrontEgg API to enable or disable the white-label mode for a specific vendor.
 
     Args:
         is_enabled (bool): A boolean indicating whether the white-label mode should be enabled or disabled.
         vendor_id (str): The ID of the vendor for which the white-label mode should be updated.
-        token (str): The authentication token for the vendor.
 
     Returns:
         Tuple[str, str]: A tuple containing the HTTP status code (first element) and the response text (second element) from the API.
     """
 
     url =  BaseUrl.__members__[region.lower()].value + FRONTEGG_WHITE_LABEL 
-        
-    headers = {
-        "accept": "application/json",
-        "content-type": "application/json",
-        "Authorization": f"Bearer {token}"
-    }
     
     payload = {
         "vendorId": vendor_id,
         "enabled": is_enabled
     }   
 
-    response = requests.request("PUT", url, headers=headers, json=payload)
+    response = await vendor_request("PUT", url, payload=payload)
     
     return {"status_code": response.status_code, "text": response.text}
 
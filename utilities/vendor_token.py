@@ -0,0 +1,109 @@
+import asyncio
+import base64
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+def _jwt_expiry(token: str) -> Optional[float]:
+    try:
+        payload = token.split('.')[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+        return float(claims['exp'])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+class VendorTokenManager:
+    """
+    Caches the vendor JWT and refreshes it before it expires.
+
+    A token is reused until `refresh_margin` seconds before its expiry. Inside that window the cached token is
+    still returned while a new one is fetched in the background, and once it has expired callers wait for the
+    refresh. Concurrent refreshes are collapsed into a single call to `fetch_token`.
+    """
+
+    def __init__(self, fetch_token: Callable[[], Awaitable[Dict[str, Any]]], refresh_margin: float, default_ttl: float):
+        """
+        Args:
+            fetch_token (Callable[[], Awaitable[Dict[str, Any]]]): Authenticates and returns the auth response
+                (`token` and optionally `expiresIn`).
+            refresh_margin (float): How many seconds before the expiry the token is refreshed.
+            default_ttl (float): The lifetime assumed when neither `expiresIn` nor the JWT `exp` claim is available.
+        """
+        self._fetch_token = fetch_token
+        self.refresh_margin = refresh_margin
+        self.default_ttl = default_ttl
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def get_token(self) -> Optional[str]:
+        """
+        Returns a valid vendor token, fetching one only when there is none or it has expired.
+
+        Returns:
+            Optional[str]: The token, or None if authentication failed.
+        """
+        now = time.monotonic()
+
+        if self._token and now < self._expires_at:
+            if now >= self._expires_at - self.refresh_margin:
+                self._start_refresh()
+
+            return self._token
+
+        return await self.refresh()
+
+    async def refresh(self) -> Optional[str]:
+        """
+        Fetches a new token, joining the refresh already in progress if there is one.
+
+        Returns:
+            Optional[str]: The new token, or None if authentication failed.
+        """
+        return await asyncio.shield(self._start_refresh())
+
+    def invalidate(self, token: Optional[str] = None) -> None:
+        """
+        Drops the cached token, e.g. after it was rejected with a 401.
+
+        Args:
+            token (Optional[str], optional): The rejected token. Nothing is dropped if the cached token is already
+                a different, newer one. Defaults to None, which always drops it.
+        """
+        if token is None or token == self._token:
+            self._token = None
+            self._expires_at = 0.0
+
+    def _start_refresh(self) -> asyncio.Task:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.ensure_future(self._refresh())
+
+        return self._refresh_task
+
+    async def _refresh(self) -> Optional[str]:
+        auth_response = await self._fetch_token()
+        token = auth_response.get('token') if isinstance(auth_response, dict) else None
+
+        if not token:
+            print(f"Vendor authentication failed: {auth_response}")
+            return None
+
+        self._token = token
+        self._expires_at = time.monotonic() + self._ttl_of(auth_response, token)
+
+        return token
+
+    def _ttl_of(self, auth_response: Dict[str, Any], token: str) -> float:
+        expires_in = auth_response.get('expiresIn')
+
+        if isinstance(expires_in, (int, float)) and expires_in > 0:
+            return float(expires_in)
+
+        expiry = _jwt_expiry(token)
+
+        if expiry is not None:
+            return max(expiry - time.time(), 0.0)
+
+        return self.default_ttl
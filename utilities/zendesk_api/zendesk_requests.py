@@ -1,16 +1,25 @@
 
 import os
-from typing import Dict
-import requests
+import time
+from typing import Dict, Mapping, Optional
 import base64
 from dotenv import load_dotenv
 
-from consts import ZENDESK_USERS_FROM_TICKET_URL
+from consts import ZENDESK_CACHE_MAX_SIZE, ZENDESK_CACHE_STALE_TTL, ZENDESK_CACHE_TTL, ZENDESK_RATE_LIMIT_BACKOFF, ZENDESK_RATE_LIMIT_RESERVE, ZENDESK_USERS_FROM_TICKET_URL
 
+from utilities.cache import TTLCache
+from utilities.http_client import HttpResponse, http_request
+from utilities.single_flight import SingleFlight
 from utilities.utils import is_domain_in_email, is_valid_email
 
 load_dotenv('.env')
 
+# ticket number -> {'payload', 'etag', 'fetched_at'}. Entries are kept for ZENDESK_CACHE_STALE_TTL so they can
+# still be served while Zendesk is throttling us, but are only considered fresh for ZENDESK_CACHE_TTL.
+zendesk_ticket_cache = TTLCache(name='zendesk_tickets', maxsize=ZENDESK_CACHE_MAX_SIZE, ttl=ZENDESK_CACHE_STALE_TTL)
+_throttled_until = 0.0
+zendesk_flights = SingleFlight(name='zendesk_tickets')
+
 async def get_auth_header_from_zendesk_api(email: str, api_token: str) -> str:
     # Combine email/token and API token with a colon (:)
     credentials = f"{os.getenv(email)}/token:{os.getenv(api_token)}"
@@ -21,15 +30,100 @@ async def get_auth_header_from_zendesk_api(email: str, api_token: str) -> str:
     # Build the Authorization header
     return f"Basic {encoded_credentials}"
     
-async def get_users_from_zd_ticket(auth_header: str, ticket_number: str) -> Dict[str,str]:
+async def get_users_from_zd_ticket(auth_header: str, ticket_number: str, use_cache: bool = True) -> Dict[str,str]:
+    """
+    Retrieves a Zendesk ticket together with its users, through a local cache.
+
+    A cached ticket is served from memory for ZENDESK_CACHE_TTL seconds. After that (or when `use_cache` is False)
+    it is revalidated with `If-None-Match`, so an unchanged ticket only costs a 304. While Zendesk is rate limiting
+    us, or our remaining quota is down to ZENDESK_RATE_LIMIT_RESERVE, the cached ticket is served even if stale.
+
+    Args:
+        auth_header (str): The Zendesk Authorization header.
+        ticket_number (str): The ticket number.
+        use_cache (bool, optional): Whether a fresh cached ticket may be returned without revalidating it. Defaults to True.
+
+    Returns:
+        Dict[str, str]: The Zendesk response, or a dictionary with an `error` key.
+    """
+    cached = zendesk_ticket_cache.get(ticket_number)
+    now = time.monotonic()
+
+    if cached:
+        is_fresh = now - cached['fetched_at'] < ZENDESK_CACHE_TTL
+
+        if (use_cache and is_fresh) or now < _throttled_until:
+            return cached['payload']
+
+    # lookups of the same ticket that arrive while it is being fetched share the request
+    return await zendesk_flights.do(
+        key=ticket_number,
+        func=lambda: _fetch_zd_ticket(auth_header=auth_header, ticket_number=ticket_number, cached=cached)
+    )
+
+async def _fetch_zd_ticket(auth_header: str, ticket_number: str, cached: Optional[Dict]) -> Dict[str,str]:
+    global _throttled_until
+
     url = ZENDESK_USERS_FROM_TICKET_URL.format(ticket_number)
     headers = {
         "Authorization": auth_header,
         "Content-Type": "application/json",
     }
+
+    if cached and cached.get('etag'):
+        headers["If-None-Match"] = cached['etag']
     
-    response = requests.get(url, headers=headers)
-    return response.json()
+    response = await http_request("GET", url, headers=headers)
+    throttle_seconds = _get_throttle_seconds(response=response)
+
+    if throttle_seconds:
+        _throttled_until = time.monotonic() + throttle_seconds
+
+    if cached and response.status_code == 304:
+        cached['fetched_at'] = time.monotonic()
+        zendesk_ticket_cache.set(ticket_number, cached)
+
+        return cached['payload']
+
+    payload = response.json()
+
+    if response.status_code == 200 and isinstance(payload, dict) and not payload.get('error'):
+        zendesk_ticket_cache.set(ticket_number, {'payload': payload, 'etag': _get_header(response.headers, 'ETag'), 'fetched_at': time.monotonic()})
+
+    elif cached:
+        print(f"Zendesk Error ({response.status_code}), serving cached ticket {ticket_number}")
+        return cached['payload']
+
+    elif not isinstance(payload, dict) or not payload:
+        return {'error': f'Zendesk returned {response.status_code}'}
+
+    return payload
+
+def _get_header(headers: Mapping[str, str], name: str) -> Optional[str]:
+    name = name.lower()
+
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+
+    return None
+
+def _get_throttle_seconds(response: HttpResponse) -> float:
+    # Zendesk sends Retry-After with a 429 and the remaining quota of the current minute on every response.
+    retry_after = _get_header(response.headers, 'Retry-After')
+
+    if retry_after and retry_after.isdigit():
+        return float(retry_after)
+
+    if response.status_code == 429:
+        return ZENDESK_RATE_LIMIT_BACKOFF
+
+    remaining = _get_header(response.headers, 'X-Rate-Limit-Remaining') or _get_header(response.headers, 'ratelimit-remaining')
+
+    if remaining and remaining.isdigit() and int(remaining) <= ZENDESK_RATE_LIMIT_RESERVE:
+        return ZENDESK_RATE_LIMIT_BACKOFF
+
+    return 0.0
 
 async def get_ticket_emails_from_zd_dict(res_dict: Dict[str,str]) -> Dict[str,str]:
     emails_dict = {